@@ -0,0 +1,293 @@
+"""Load generator: replay a circulation-desk trace against the lms_test2 logic layer.
+
+    python bench_circulation.py [--ops 2000] [--concurrency 4] [--books 2000] [--patrons 500]
+                                [--trace day.jsonl] [--record day.jsonl] [--sharded N] [--seed 1]
+
+Without --trace a synthetic desk day is generated (searches, borrows,
+returns, reviews, patron and book adds); --record saves it as JSONL so the
+same day can be replayed later. Tk dialogs are replaced by a
+non-interactive resolver, so nothing blocks. Reports throughput,
+p50/p95/p99 latency per operation type and memory over time.
+
+Trace lines look like:
+    {"op": "search", "query": "potter"}
+    {"op": "borrow", "patron": "P000012", "book": "B0000042"}
+    {"op": "return", "patron": "P000012", "book": "B0000042"}
+    {"op": "review", "book": "B0000042", "text": "Loved it"}
+    {"op": "add_patron", "patron": "P001000", "name": "Ada Lovelace"}
+    {"op": "add_book", "book": "B0005000", "title": "...", "author": "...", "copies": 2}
+"""
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import lms_test2 as lms
+
+
+# ===========================
+# Non-interactive dialogs
+# ===========================
+class HeadlessDialogs:
+    """Stands in for tkinter's messagebox and simpledialog.
+
+    askstring() answers from a per-thread script set before each operation;
+    askyesno() always says yes (place the hold, add the duplicate). Errors
+    shown by the logic layer are recorded so the op can be counted as
+    rejected.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def script(self, *answers):
+        self._local.answers = list(answers)
+        self._local.errors = []
+
+    def errors(self):
+        return getattr(self._local, "errors", [])
+
+    def askstring(self, title, prompt, **kw):
+        answers = getattr(self._local, "answers", [])
+        return answers.pop(0) if answers else None
+
+    def askyesno(self, title, message, **kw):
+        return True
+
+    def showerror(self, title, message, **kw):
+        self.errors().append(message)
+
+    def showinfo(self, title, message, **kw):
+        pass
+
+
+dialogs = HeadlessDialogs()
+lms.messagebox = dialogs
+lms.simpledialog = dialogs
+
+# The logic layer isn't thread-safe for writes; searches run unlocked (they
+# iterate snapshots), mutations are serialised here like a single desk server would.
+_write_lock = threading.Lock()
+
+
+# ===========================
+# Operations
+# ===========================
+def op_search(rec):
+    lms.search_books_logic(rec["query"])
+    return True
+
+def op_borrow(rec):
+    dialogs.script(rec["patron"], rec["book"])
+    with _write_lock:
+        return lms.borrow_book_logic()[1] is not None
+
+def op_return(rec):
+    dialogs.script(rec["patron"], rec["book"])
+    with _write_lock:
+        return lms.return_book_logic()[1] is not None
+
+def op_review(rec):
+    label = lms.score_review(rec["text"])      # the slow part stays outside the lock
+    with _write_lock:
+        return lms.add_review_logic(rec["book"], rec["text"], label) is not None
+
+def op_add_patron(rec):
+    with _write_lock:
+        return lms.add_borrower_logic(rec["patron"], rec["name"])
+
+def op_add_book(rec):
+    with _write_lock:
+        return lms.add_book_logic(rec["book"], rec["title"], rec["author"], rec.get("copies", 1))
+
+OPS = {
+    'search': op_search,
+    'borrow': op_borrow,
+    'return': op_return,
+    'review': op_review,
+    'add_patron': op_add_patron,
+    'add_book': op_add_book,
+}
+
+MIX = {'search': 0.50, 'borrow': 0.15, 'return': 0.15, 'review': 0.10, 'add_patron': 0.05, 'add_book': 0.05}
+
+
+# ===========================
+# Synthetic desk day
+# ===========================
+WORDS = ("shadow river crown garden winter silent empire glass ocean stone midnight fire "
+         "secret letter house journey forest iron queen storm light dark city dream war "
+         "song heart wolf island mountain star golden last lost hidden broken").split()
+NAMES = ("ada alan grace linus ken dennis barbara margaret john guido james bjarne "
+         "frances radia edsger donald niklaus tim vint leslie").split()
+REVIEWS = ("Loved it, a wonderful read", "Terrible pacing and a bad ending", "It was fine",
+           "Great characters, good plot", "Boring and far too long", "An okay book")
+
+
+def _typo(rng, word):
+    if len(word) > 4 and rng.random() < 0.3:
+        i = rng.randrange(len(word))
+        return word[:i] + word[i + 1:]
+    return word
+
+
+def synthetic_catalog(rng, n_books, n_patrons):
+    catalog = [(f"B{i:07d}", " ".join(rng.sample(WORDS, rng.randint(2, 4))).title(),
+                " ".join(rng.sample(NAMES, 2)).title(), rng.randint(1, 3)) for i in range(n_books)]
+    patrons = [(f"P{i:06d}", " ".join(rng.sample(NAMES, 2)).title()) for i in range(n_patrons)]
+    return catalog, patrons
+
+
+def synthetic_trace(rng, n_ops, n_books, n_patrons):
+    """A desk day; loans are tracked while generating so most returns are valid."""
+    loans = []
+    next_book, next_patron = n_books, n_patrons
+    ops, weights = zip(*MIX.items())
+    for _ in range(n_ops):
+        op = rng.choices(ops, weights)[0]
+        if op == "return" and not loans:
+            op = "search"
+        if op == "search":
+            if rng.random() < 0.2:
+                query = f"author:{rng.choice(NAMES)} available:yes"
+            else:
+                query = " ".join(_typo(rng, w) for w in rng.sample(WORDS, rng.randint(1, 2)))
+            yield {"op": op, "query": query}
+        elif op == "borrow":
+            rec = {"op": op, "patron": f"P{rng.randrange(next_patron):06d}", "book": f"B{rng.randrange(next_book):07d}"}
+            loans.append((rec["patron"], rec["book"]))
+            yield rec
+        elif op == "return":
+            patron, book = loans.pop(rng.randrange(len(loans)))
+            yield {"op": op, "patron": patron, "book": book}
+        elif op == "review":
+            yield {"op": op, "book": f"B{rng.randrange(next_book):07d}", "text": rng.choice(REVIEWS)}
+        elif op == "add_patron":
+            yield {"op": op, "patron": f"P{next_patron:06d}", "name": " ".join(rng.sample(NAMES, 2)).title()}
+            next_patron += 1
+        elif op == "add_book":
+            yield {"op": op, "book": f"B{next_book:07d}", "title": " ".join(rng.sample(WORDS, 3)).title(),
+                   "author": " ".join(rng.sample(NAMES, 2)).title(), "copies": rng.randint(1, 3)}
+            next_book += 1
+
+
+# ===========================
+# Driver
+# ===========================
+def _memory_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except (OSError, ValueError, AttributeError):
+        import resource     # peak, not current, but better than nothing off Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3
+
+
+def _percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+
+def replay(trace, concurrency=4, samples_wanted=20):
+    """Run every trace record; returns (latencies, rejected, failed, memory samples, elapsed)."""
+    latencies = defaultdict(list)
+    rejected = defaultdict(int)     # the logic layer said no (not found, no copy...)
+    failed = defaultdict(int)       # raised an exception
+    stats_lock = threading.Lock()
+    in_flight = threading.BoundedSemaphore(concurrency * 2)
+
+    def run(rec):
+        try:
+            dialogs.script()
+            start = time.perf_counter()
+            try:
+                ok = OPS[rec["op"]](rec)
+                error = None
+            except Exception as e:
+                ok, error = False, e
+            elapsed = time.perf_counter() - start
+            with stats_lock:
+                latencies[rec["op"]].append(elapsed)
+                if error is not None:
+                    failed[rec["op"]] += 1
+                elif not ok or dialogs.errors():
+                    rejected[rec["op"]] += 1
+        finally:
+            in_flight.release()
+
+    samples = []
+    sample_every = max(1, len(trace) // samples_wanted)
+    start = time.perf_counter()
+    done = 0
+    samples.append((0.0, 0, _memory_mb()))
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for rec in trace:
+            in_flight.acquire()
+            pool.submit(run, rec)
+            done += 1
+            if done % sample_every == 0:
+                samples.append((time.perf_counter() - start, done, _memory_mb()))
+    elapsed = time.perf_counter() - start
+    samples.append((elapsed, done, _memory_mb()))
+    return latencies, rejected, failed, samples, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ops", type=int, default=2000, help="synthetic trace length")
+    parser.add_argument("--books", type=int, default=2000, help="catalog size before the day starts")
+    parser.add_argument("--patrons", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=4, help="worker threads replaying the trace")
+    parser.add_argument("--trace", help="replay this JSONL trace instead of a synthetic one")
+    parser.add_argument("--record", help="write the synthetic trace here as JSONL")
+    parser.add_argument("--sharded", type=int, default=None, help="enable sharded search with N worker processes (0 = one per core)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    catalog, patrons = synthetic_catalog(rng, args.books, args.patrons)
+    dialogs.script()
+    t0 = time.perf_counter()
+    lms.add_books_bulk_logic(catalog, allow_duplicates=True)
+    for patron_id, name in patrons:
+        lms.add_borrower_logic(patron_id, name)
+    print(f"Seeded {len(lms.books)} books and {len(lms.borrowers)} patrons in {time.perf_counter() - t0:.1f}s")
+    if args.sharded is not None:
+        lms.enable_sharded_search(args.sharded or None)
+
+    if args.trace:
+        with open(args.trace, encoding="utf-8") as f:
+            trace = [json.loads(line) for line in f if line.strip()]
+    else:
+        trace = list(synthetic_trace(rng, args.ops, args.books, args.patrons))
+        if args.record:
+            with open(args.record, "w", encoding="utf-8") as f:
+                f.writelines(json.dumps(rec) + "\n" for rec in trace)
+
+    latencies, rejected, failed, samples, elapsed = replay(trace, args.concurrency)
+    lms.disable_sharded_search()
+
+    total = sum(len(v) for v in latencies.values())
+    print(f"\n{total} ops in {elapsed:.2f}s with {args.concurrency} workers = {total / elapsed:,.0f} ops/s\n")
+    print(f"{'op':<11}{'count':>8}{'rejected':>10}{'failed':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for op in OPS:
+        values = sorted(latencies.get(op, ()))
+        if not values:
+            continue
+        p50, p95, p99 = (_percentile(values, p) * 1000 for p in (50, 95, 99))
+        print(f"{op:<11}{len(values):>8}{rejected[op]:>10}{failed[op]:>8}{p50:>10.2f}{p95:>10.2f}{p99:>10.2f}")
+
+    print(f"\n{'t (s)':>8}{'ops':>10}{'RSS MB':>10}")
+    for t, n, mb in samples:
+        print(f"{t:>8.1f}{n:>10}{mb:>10.1f}")
+    print(f"memory growth: {samples[-1][2] - samples[0][2]:+.1f} MB over the run")
+
+
+if __name__ == "__main__":
+    main()
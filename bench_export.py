@@ -0,0 +1,56 @@
+"""Benchmark: streaming export throughput (rows/second) and peak memory.
+
+    python bench_export.py [n_books]
+
+Exports a synthetic catalog (plus patrons, loans and reviews) in every
+available format. Throughput is measured on a plain run; the peak Python
+heap is measured on a second run under tracemalloc and should stay flat as
+n_books grows.
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import lms_export
+
+
+def synthetic_data(n_books):
+    books, borrowers = {}, {}
+    for i in range(n_books):
+        books[f"B{i:07d}"] = {
+            'title': f"Title number {i}", 'author': f"Author {i % 997}",
+            'available': i % 3 != 0, 'copies': 1, 'free': int(i % 3 != 0), 'holds': (),
+            'reviews': [(f"review of {i}", "Positive")] if i % 5 == 0 else [],
+            'keywords': set(),
+        }
+    for j in range(max(1, n_books // 10)):
+        loans = [f"B{k:07d}" for k in range(j * 30, min(j * 30 + 3, n_books)) if k % 3 == 0]
+        borrowers[f"P{j:06d}"] = {'name': f"Patron {j}", 'name_tokens': [], 'borrowed_books': loans}
+    return books, borrowers
+
+
+def main():
+    n_books = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    books, borrowers = synthetic_data(n_books)
+    print(f"{len(books)} books, {len(borrowers)} patrons, chunk size {lms_export.CHUNK_SIZE}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in lms_export.FORMATS:
+            start = time.perf_counter()
+            counts = lms_export.export_all(books, borrowers, tmp, fmt)
+            elapsed = time.perf_counter() - start
+            rows = sum(counts.values())
+            size = sum(os.path.getsize(os.path.join(tmp, f"{t}.{fmt}")) for t in counts
+                       if os.path.exists(os.path.join(tmp, f"{t}.{fmt}")))
+
+            tracemalloc.start()
+            lms_export.export_all(books, borrowers, tmp, fmt)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"{fmt:>8}: {rows} rows in {elapsed:6.2f}s = {rows / elapsed:10,.0f} rows/s, "
+                  f"{size / 1e6:7.1f} MB on disk, peak heap {peak / 1e6:6.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
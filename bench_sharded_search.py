@@ -0,0 +1,62 @@
+"""Benchmark: sharded fuzzy search speedup vs. worker count.
+
+    python bench_sharded_search.py [n_books] [n_queries]
+
+Builds a synthetic catalog shaped like lms_test2.books (keyword sets per
+book), then times the same queries in-process and with 1, 2, 4, ... worker
+processes up to os.cpu_count().
+"""
+import os
+import random
+import string
+import sys
+import time
+
+from lms_shard import ShardedIndex
+
+
+def synthetic_books(n_books, vocab_size, seed=7):
+    rng = random.Random(seed)
+    vocab = {"".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 10))) for _ in range(vocab_size)}
+    vocab = sorted(vocab)
+    return {f"B{i:07d}": {'keywords': set(rng.sample(vocab, rng.randint(2, 6)))} for i in range(n_books)}, vocab
+
+
+def time_queries(index, queries):
+    index.search(queries[0])      # warm-up: workers attach and decode their slice
+    start = time.perf_counter()
+    hits = 0
+    for q in queries:
+        hits += len(index.search(q))
+    return time.perf_counter() - start, hits
+
+
+def main():
+    n_books = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    n_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    books, vocab = synthetic_books(n_books, vocab_size=n_books // 2)
+    rng = random.Random(11)
+    queries = [[rng.choice(vocab), rng.choice(vocab)] for _ in range(n_queries)]
+    print(f"{n_books} books, {len(vocab)} distinct keywords, {n_queries} queries, {os.cpu_count()} cores")
+
+    index = ShardedIndex(books, workers=0)
+    base, expected = time_queries(index, queries)
+    index.close()
+    print(f"{'in-process':>12}: {base / n_queries * 1000:9.1f} ms/query")
+
+    counts, w = [], 1
+    while w <= (os.cpu_count() or 1):
+        counts.append(w)
+        w *= 2
+    if counts[-1] != os.cpu_count():
+        counts.append(os.cpu_count())
+    for workers in counts:
+        index = ShardedIndex(books, workers=workers)
+        elapsed, hits = time_queries(index, queries)
+        index.close()
+        assert hits == expected, "sharded results differ from in-process results"
+        print(f"{workers:>4} workers: {elapsed / n_queries * 1000:9.1f} ms/query   speedup x{base / elapsed:5.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import time
+from unittest import mock
+
+import pytest
+
+
+class FakeRoot:
+    """Just enough of a Tk root for TaskRunner: after() callbacks run when pump() is called."""
+
+    def __init__(self):
+        self.pending = []
+
+    def after(self, ms, fn, *args):
+        self.pending.append((fn, args))
+        return len(self.pending)
+
+    def after_cancel(self, job):
+        pass
+
+    def pump(self, until, timeout=10.0):
+        deadline = time.monotonic() + timeout
+        while not until():
+            if time.monotonic() > deadline:
+                raise AssertionError("timed out waiting for the task runner")
+            pending, self.pending = self.pending, []
+            for fn, args in pending:
+                fn(*args)
+            time.sleep(0.005)
+
+
+@pytest.fixture
+def root():
+    return FakeRoot()
+
+
+@pytest.fixture
+def lms(monkeypatch):
+    """lms_test2 with empty stores and dialogs replaced by a mock."""
+    import lms_test2
+    for store in (lms_test2.books, lms_test2.borrowers, lms_test2._book_ids_ci, lms_test2._borrower_ids_ci):
+        store.clear()
+    lms_test2._field_index.clear()
+    lms_test2._dup_index.clear()
+    monkeypatch.setattr(lms_test2, "messagebox", mock.MagicMock())
+    monkeypatch.setattr(lms_test2, "simpledialog", mock.MagicMock())
+    return lms_test2
@@ -0,0 +1,191 @@
+import random
+import re
+import threading
+import zlib
+
+from nltk.metrics import edit_distance
+
+
+# ===========================
+# Near-duplicate detection (MinHash + LSH)
+# ===========================
+# Each book's keyword set is expanded into character trigrams (so "rowling"
+# and "rowlling" still overlap) and summarised as a MinHash signature. The
+# signature is cut into bands; books sharing any band land in the same LSH
+# bucket, so a new book is only compared with the few books it collides
+# with instead of the whole catalog.
+#
+# A misspelt author drags the whole-record similarity down to about the
+# level of a sequel by the same author ("Dune / Frank Herbet" and "Dune
+# Messiah / Frank Herbert" both score ~0.7 against "Dune / Frank Herbert"),
+# so the estimate only picks candidates. A candidate is flagged when its
+# title is (nearly) the same and its author is within a few typos.
+
+NUM_HASHES = 64
+BANDS = 16              # 16 bands x 4 rows: pairs above ~0.5 similarity usually collide
+ROWS = NUM_HASHES // BANDS
+THRESHOLD = 0.5         # estimated Jaccard similarity for a pair to be checked field by field
+TITLE_TYPOS = 0.1       # edits allowed, as a fraction of title length
+AUTHOR_TYPOS = 0.25     # ... and of author length (initials and all)
+
+_PRIME = (1 << 61) - 1
+_rng = random.Random(20240601)      # fixed seed: signatures are comparable across runs
+_PARAMS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_HASHES)]
+
+
+def shingles(keywords):
+    """Character trigrams of the alphanumeric keywords (punctuation tokens are ignored)."""
+    out = set()
+    for kw in keywords:
+        if not kw.isalnum():
+            continue
+        padded = f"#{kw}#"
+        out.update(padded[i:i + 3] for i in range(max(1, len(padded) - 2)))
+    return out
+
+
+def signature(keywords):
+    hashes = [zlib.crc32(s.encode("utf-8")) for s in shingles(keywords)]
+    if not hashes:
+        return None
+    return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in _PARAMS)
+
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity: fraction of matching MinHash slots."""
+    return sum(x == y for x, y in zip(sig_a, sig_b)) / NUM_HASHES
+
+
+def _normalise(tokens):
+    # "J.R.R." and "J. R. R." both become "jrr"; punctuation tokens vanish
+    return " ".join(filter(None, (re.sub(r"\W", "", t) for t in tokens)))
+
+
+_ROMAN = re.compile(r"(?=[ivx]+$)x{0,3}(?:ix|iv|v?i{0,3})$")     # i..xxxix: volume numbers, not "mix"
+
+
+def _numbers(title):
+    # volume/part/year markers: "naruto vol 2" and "naruto vol 3" are different books
+    return re.findall(r"\d+", title) + [w for w in title.split() if _ROMAN.match(w)]
+
+
+def _close(a, b, allowance):
+    limit = int(max(len(a), len(b)) * allowance)
+    return abs(len(a) - len(b)) <= limit and edit_distance(a, b, transpositions=True) <= limit
+
+
+def same_book(fields_a, fields_b):
+    """True if two normalised (title, author) pairs look like one book.
+
+    Titles may differ by a typo or two but never in their numbers (digits
+    or roman numerals), so numbered volumes are not duplicates of each other.
+    """
+    (title_a, author_a), (title_b, author_b) = fields_a, fields_b
+    return (_numbers(title_a) == _numbers(title_b)
+            and _close(title_a, title_b, TITLE_TYPOS)
+            and _close(author_a.replace(" ", ""), author_b.replace(" ", ""), AUTHOR_TYPOS))
+
+
+class DuplicateIndex:
+    """LSH bucket index of book signatures.
+
+    candidates() checks one book against the catalog by looking only at the
+    books sharing an LSH bucket with it, then compares title and author
+    (see same_book); report() groups every likely duplicate in the catalog
+    the same way. tokenize is used by rebuild() to re-split titles and
+    authors.
+    """
+
+    def __init__(self, tokenize, threshold=THRESHOLD):
+        self.tokenize = tokenize
+        self.threshold = threshold
+        self._lock = threading.RLock()
+        self.clear()
+
+    def clear(self):
+        self._signatures = {}
+        self._fields = {}       # book_id -> normalised (title, author)
+        self._buckets = {}      # (band, rows) -> [book_id]
+
+    def __len__(self):
+        return len(self._signatures)
+
+    @staticmethod
+    def _bands(sig):
+        return [(band, sig[band * ROWS:(band + 1) * ROWS]) for band in range(BANDS)]
+
+    def rebuild(self, books):
+        with self._lock:
+            self.clear()
+            for book_id, info in list(books.items()):
+                self.add(book_id, self.tokenize(info['title']), self.tokenize(info['author']))
+
+    def add(self, book_id, title_tokens, author_tokens, sig=None):
+        sig = sig or signature(set(title_tokens) | set(author_tokens))
+        with self._lock:
+            if book_id in self._signatures:     # already there (e.g. a rebuild got to it first)
+                return
+            self._signatures[book_id] = sig
+            self._fields[book_id] = (_normalise(title_tokens), _normalise(author_tokens))
+            if sig is None:
+                return
+            for key in self._bands(sig):
+                self._buckets.setdefault(key, []).append(book_id)
+
+    def candidates(self, title_tokens, author_tokens, sig=None, exclude=None):
+        """[(book_id, similarity)] of likely duplicates, most similar first."""
+        sig = sig or signature(set(title_tokens) | set(author_tokens))
+        if sig is None:
+            return []
+        fields = (_normalise(title_tokens), _normalise(author_tokens))
+        with self._lock:
+            seen = set()
+            for key in self._bands(sig):
+                seen.update(self._buckets.get(key, ()))
+            seen.discard(exclude)
+            scored = [(book_id, similarity(sig, self._signatures[book_id])) for book_id in seen
+                      if same_book(fields, self._fields[book_id])]
+        return sorted([c for c in scored if c[1] >= self.threshold], key=lambda c: -c[1])
+
+    def report(self, task=None):
+        """Groups (lists of book_ids, in insertion order) of likely duplicates across the catalog."""
+        with self._lock:
+            buckets = [list(ids) for ids in self._buckets.values() if len(ids) > 1]
+            signatures = dict(self._signatures)
+            fields = dict(self._fields)
+        order = {book_id: n for n, book_id in enumerate(signatures)}
+
+        # union-find over verified pairs from shared buckets
+        parent = {}
+
+        def find(x):
+            root = x
+            while parent[root] != root:
+                root = parent[root]
+            while parent[x] != root:
+                parent[x], x = root, parent[x]
+            return root
+
+        checked = set()
+        for n, ids in enumerate(buckets):
+            if task and n % 500 == 0:
+                task.check()
+                task.report(n, len(buckets), "Looking for duplicates")
+            for i, a in enumerate(ids):
+                for b in ids[i + 1:]:
+                    pair = (a, b) if order[a] < order[b] else (b, a)
+                    if pair in checked:
+                        continue
+                    checked.add(pair)
+                    if (similarity(signatures[a], signatures[b]) >= self.threshold
+                            and same_book(fields[a], fields[b])):
+                        parent.setdefault(a, a)
+                        parent.setdefault(b, b)
+                        ra, rb = find(a), find(b)
+                        if ra != rb:
+                            parent[max(ra, rb, key=order.get)] = min(ra, rb, key=order.get)
+
+        groups = {}
+        for book_id in parent:
+            groups.setdefault(find(book_id), []).append(book_id)
+        return sorted((sorted(g, key=order.get) for g in groups.values()), key=lambda g: order[g[0]])
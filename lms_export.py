@@ -0,0 +1,147 @@
+import csv
+import json
+import os
+from itertools import islice
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:     # Parquet export is optional
+    pa = pq = None
+
+
+# ===========================
+# Streaming export (CSV / JSONL / Parquet)
+# ===========================
+# Rows are produced by generators and written chunk by chunk, so memory use
+# does not grow with the size of the catalog. The only O(n) piece is the
+# snapshot of record IDs taken up front, which lets an export run on a
+# background thread while the UI keeps adding books and borrowers.
+
+CHUNK_SIZE = 5000
+
+COLUMNS = {
+    'catalog': ("book_id", "title", "author", "available", "copies", "free", "holds", "review_count"),
+    'patrons': ("borrower_id", "name", "borrowed_count"),
+    'loans':   ("borrower_id", "borrower_name", "book_id", "title"),
+    'reviews': ("book_id", "review", "sentiment"),
+}
+
+# Parquet needs a fixed column type even when a table has no rows
+_INT_COLUMNS = {"copies", "free", "holds", "review_count", "borrowed_count"}
+
+FORMATS = ("csv", "jsonl", "parquet") if pa is not None else ("csv", "jsonl")
+
+
+def catalog_rows(books, borrowers):
+    for book_id in list(books):
+        info = books.get(book_id)
+        if info is not None:
+            yield (book_id, info['title'], info['author'], info['available'],
+                   info['copies'], info['free'], len(info['holds']), len(info['reviews']))
+
+def patron_rows(books, borrowers):
+    for borrower_id in list(borrowers):
+        info = borrowers.get(borrower_id)
+        if info is not None:
+            yield (borrower_id, info['name'], len(info['borrowed_books']))
+
+def loan_rows(books, borrowers):
+    for borrower_id in list(borrowers):
+        info = borrowers.get(borrower_id)
+        if info is None:
+            continue
+        for book_id in list(info['borrowed_books']):
+            book = books.get(book_id)
+            yield (borrower_id, info['name'], book_id, book['title'] if book else "")
+
+def review_rows(books, borrowers):
+    for book_id in list(books):
+        info = books.get(book_id)
+        if info is None:
+            continue
+        for text, label in list(info['reviews']):
+            yield (book_id, text, label)
+
+TABLES = {
+    'catalog': catalog_rows,
+    'patrons': patron_rows,
+    'loans': loan_rows,
+    'reviews': review_rows,
+}
+
+
+def chunks(rows, size=CHUNK_SIZE):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _write_csv(path, columns, row_chunks):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(columns)
+        for chunk in row_chunks:
+            w.writerows(chunk)
+            yield len(chunk)
+
+def _write_jsonl(path, columns, row_chunks):
+    with open(path, "w", encoding="utf-8") as f:
+        for chunk in row_chunks:
+            f.write("".join(json.dumps(dict(zip(columns, row)), ensure_ascii=False) + "\n" for row in chunk))
+            yield len(chunk)
+
+def _parquet_schema(columns):
+    return pa.schema([(c, pa.bool_() if c == "available" else pa.int64() if c in _INT_COLUMNS else pa.string())
+                      for c in columns])
+
+def _write_parquet(path, columns, row_chunks):
+    schema = _parquet_schema(columns)
+    # opened up front so an empty table still gets a file, like the CSV header
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in row_chunks:
+            writer.write_table(pa.Table.from_arrays([pa.array(col, type=field.type)
+                                                     for col, field in zip(zip(*chunk), schema)], schema=schema))
+            yield len(chunk)
+
+WRITERS = {'csv': _write_csv, 'jsonl': _write_jsonl, 'parquet': _write_parquet}
+
+
+def export_table(table, books, borrowers, path, fmt="csv", chunk_size=CHUNK_SIZE, task=None):
+    """Stream one table ('catalog', 'patrons', 'loans', 'reviews') to path.
+
+    Returns the number of rows written. Pass a lms_tasks.Task to report
+    progress and allow cancellation between chunks.
+    """
+    if table not in TABLES:
+        raise ValueError(f"Unknown table: {table}")
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported format: {fmt}" + (" (install pyarrow)" if fmt == "parquet" else ""))
+
+    total = {'catalog': len(books), 'patrons': len(borrowers)}.get(table)   # one row per record
+    written = 0
+    out = WRITERS[fmt](path, COLUMNS[table], chunks(TABLES[table](books, borrowers), chunk_size))
+    try:
+        for n in out:
+            written += n
+            if task:
+                task.check()
+                task.report(written, total and max(total, written), f"Exporting {table}: {written} rows")
+    except BaseException:
+        # don't leave a truncated file behind on cancel or error
+        out.close()
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+    return written
+
+
+def export_all(books, borrowers, directory, fmt="csv", chunk_size=CHUNK_SIZE, task=None):
+    """Export every table into directory as <table>.<fmt>; returns {table: rows}."""
+    os.makedirs(directory, exist_ok=True)
+    return {table: export_table(table, books, borrowers, os.path.join(directory, f"{table}.{fmt}"),
+                                fmt, chunk_size, task)
+            for table in TABLES}
@@ -0,0 +1,263 @@
+import re
+import threading
+from array import array
+from bisect import bisect_left, bisect_right, insort
+
+from nltk.metrics import edit_distance
+
+
+# ===========================
+# Field-scoped catalog queries
+# ===========================
+#   author:rowling available:yes        implicit AND
+#   title:potter OR title:hobbit        OR (AND binds tighter)
+#   tolkien NOT title:silmarillion      NOT / -term / -( ... )
+#   (title:dune OR title:emma) id:B100..B200
+#   author:=rowling                     exact term, no fuzzy expansion
+#   author:"j k rowling"                every word must match
+#   author: rowling                     a space after the colon is fine
+# A bare term searches title and author. Terms are fuzzy (edit distance <= 2)
+# but only against the vocabulary of their own field. Field names are case
+# insensitive; AND/OR/NOT and -term are only operators in a query that uses
+# at least one field, so a plain "WHAT NOT TO WEAR" stays a keyword search.
+
+MAX_DISTANCE = 2
+TEXT_FIELDS = ("title", "author")
+FIELDS = TEXT_FIELDS + ("available", "id")
+
+_LEXER = re.compile(r'\(|\)|[^\s()":]+:(?:\s*"[^"]*"|\s*(?!(?:AND|OR|NOT)(?:[\s()]|$))[^\s()"]+)?|"[^"]*"|[^\s()]+')
+_STRUCTURED = re.compile(r'(?:^|[\s(-])(?:' + "|".join(FIELDS) + r'):', re.IGNORECASE)
+
+
+class QueryError(ValueError):
+    """Raised for malformed query syntax (unbalanced parentheses, unknown field...)."""
+
+
+def is_structured(query):
+    """True if query uses at least one field:value term (Author:rowling counts too)."""
+    return bool(query and _STRUCTURED.search(query))
+
+
+def _natural_key(book_id):
+    # "B20" sorts before "B100"
+    return tuple((0, int(part), "") if part.isdigit() else (1, 0, part)
+                 for part in re.findall(r"\d+|\D+", book_id.lower()))
+
+
+class FieldIndex:
+    """Per-field inverted indexes over the catalog.
+
+    Text fields map token -> sorted array('i') of book positions (books are
+    only appended, so postings stay sorted for free). Availability is kept as
+    two position sets so borrow/return can flip a book in O(1), and IDs are
+    held in a sorted list for range filters. Queries are evaluated with set
+    intersection/union/difference, smallest operand first. A lock makes it
+    safe to search from a background task while the UI adds books.
+    """
+
+    def __init__(self, tokenize):
+        self.tokenize = tokenize        # str -> list of lowercased, stopword-free tokens
+        self._lock = threading.RLock()
+        self.clear()
+
+    def clear(self):
+        self.book_ids = []
+        self._pos = {}
+        self._pos_ci = {}
+        self._postings = {field: {} for field in TEXT_FIELDS}
+        self._available = {True: set(), False: set()}
+        self._sorted_ids = []
+
+    def __len__(self):
+        return len(self.book_ids)
+
+    def rebuild(self, books):
+        with self._lock:
+            self.clear()
+            for book_id, info in list(books.items()):
+                self.add(book_id, self.tokenize(info['title']), self.tokenize(info['author']), info['available'])
+
+    def add(self, book_id, title_tokens, author_tokens, available=True):
+        """Index one book; a book_id that is already indexed is left alone.
+
+        That makes a rebuild() racing with the caller's own add() harmless:
+        whichever runs second is a no-op.
+        """
+        with self._lock:
+            if book_id in self._pos:
+                return
+            pos = len(self.book_ids)
+            self.book_ids.append(book_id)
+            self._pos[book_id] = pos
+            self._pos_ci[book_id.lower()] = pos
+            for field, tokens in (("title", title_tokens), ("author", author_tokens)):
+                postings = self._postings[field]
+                for token in set(tokens):
+                    postings.setdefault(token, array("i")).append(pos)
+            self._available[bool(available)].add(pos)
+            insort(self._sorted_ids, (_natural_key(book_id), pos))
+
+    def set_available(self, book_id, available):
+        with self._lock:
+            pos = self._pos.get(book_id)
+            if pos is not None:
+                self._available[not available].discard(pos)
+                self._available[bool(available)].add(pos)
+
+    def search(self, query):
+        """Book IDs matching query, in catalog order. Raises QueryError on bad syntax."""
+        tree = _Parser(_LEXER.findall(query)).parse()
+        if tree is None:
+            return []
+        with self._lock:
+            positions = self._eval(tree)
+            return [self.book_ids[p] for p in sorted(positions)]
+
+    # evaluation
+    def _eval(self, node):
+        kind = node[0]
+        if kind == "term":
+            return self._term(node[1], node[2], node[3])
+        if kind == "or":
+            out = set()
+            for child in node[1]:
+                out |= self._eval(child)
+            return out
+        if kind == "not":
+            return set(range(len(self.book_ids))) - self._eval(node[1])
+        # and: intersect the positive operands (smallest first), then subtract the negated ones
+        positives = [child for child in node[1] if child[0] != "not"]
+        negatives = [child[1] for child in node[1] if child[0] == "not"]
+        if positives:
+            sets = sorted((self._eval(child) for child in positives), key=len)
+            out = sets[0]
+            for other in sets[1:]:
+                if not out:
+                    break
+                out &= other
+        else:
+            out = set(range(len(self.book_ids)))
+        for child in negatives:
+            if not out:
+                break
+            out -= self._eval(child)
+        return out
+
+    def _term(self, field, value, exact):
+        if field == "available":
+            if value.lower() in ("yes", "true", "1", "y"):
+                return set(self._available[True])
+            if value.lower() in ("no", "false", "0", "n"):
+                return set(self._available[False])
+            raise QueryError(f"available: expects yes or no, got '{value}'")
+        if field == "id":
+            return self._id_range(value)
+
+        tokens = self.tokenize(value)
+        if not tokens:
+            return set()
+        fields = TEXT_FIELDS if field is None else (field,)
+        out = None
+        for token in tokens:     # every word of a (quoted) value must match
+            hits = set()
+            for f in fields:
+                for kw in self._expand(f, token, exact):
+                    hits.update(self._postings[f][kw])
+            out = hits if out is None else out & hits
+            if not out:
+                break
+        return out
+
+    def _expand(self, field, token, exact):
+        postings = self._postings[field]
+        if exact:
+            return [token] if token in postings else []
+        # fuzzy expansion restricted to this field's vocabulary
+        return [kw for kw in postings
+                if abs(len(kw) - len(token)) <= MAX_DISTANCE and edit_distance(token, kw) <= MAX_DISTANCE]
+
+    def _id_range(self, value):
+        lo, sep, hi = value.partition("..")
+        if not sep:
+            pos = self._pos_ci.get(value.lower())
+            return set() if pos is None else {pos}
+        start = bisect_left(self._sorted_ids, (_natural_key(lo),)) if lo else 0
+        end = bisect_right(self._sorted_ids, (_natural_key(hi), len(self.book_ids))) if hi else len(self._sorted_ids)
+        return {pos for _, pos in self._sorted_ids[start:end]}
+
+
+class _Parser:
+    """Recursive descent: or := and (OR and)*; and := not (AND? not)*; not := (NOT|-) not | atom."""
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.i = 0
+
+    def parse(self):
+        if not self.tokens:
+            return None
+        node = self._or()
+        if self.i < len(self.tokens):
+            raise QueryError(f"Unexpected '{self.tokens[self.i]}'")
+        return node
+
+    def _peek(self):
+        return self.tokens[self.i] if self.i < len(self.tokens) else None
+
+    def _or(self):
+        children = [self._and()]
+        while self._peek() == "OR":
+            self.i += 1
+            children.append(self._and())
+        return children[0] if len(children) == 1 else ("or", children)
+
+    def _and(self):
+        children = [self._not()]
+        while self._peek() not in (None, ")", "OR"):
+            if self._peek() == "AND":
+                self.i += 1
+            children.append(self._not())
+        return children[0] if len(children) == 1 else ("and", children)
+
+    def _not(self):
+        tok = self._peek()
+        if tok == "NOT":
+            self.i += 1
+            return ("not", self._not())
+        if tok == "-":
+            # -( ... ): the lexer splits the dash from the parenthesis
+            self.i += 1
+            if self._peek() != "(":
+                raise QueryError("'-' must be followed by a term or '('")
+            return ("not", self._not())
+        if tok and tok.startswith("-"):
+            self.tokens[self.i] = tok[1:]
+            return ("not", self._not())
+        return self._atom()
+
+    def _atom(self):
+        tok = self._peek()
+        if tok is None:
+            raise QueryError("Query ends unexpectedly")
+        self.i += 1
+        if tok == "(":
+            node = self._or()
+            if self._peek() != ")":
+                raise QueryError("Missing ')'")
+            self.i += 1
+            return node
+        if tok in (")", "AND", "OR"):
+            raise QueryError(f"Unexpected '{tok}'")
+
+        field, sep, value = tok.partition(":")
+        if not sep:
+            field, value = None, tok
+        elif field.lower() not in FIELDS:
+            raise QueryError(f"Unknown field '{field}' (use {', '.join(FIELDS)})")
+        else:
+            field = field.lower()
+        exact = value.startswith("=")
+        value = value.strip().lstrip("=").strip('"')
+        if not value:
+            raise QueryError(f"Missing value for '{field}:'")
+        return ("term", field, value, exact)
@@ -0,0 +1,205 @@
+import multiprocessing
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from nltk.metrics import edit_distance
+
+
+# ===========================
+# Sharded fuzzy search
+# ===========================
+# The keyword index (vocabulary -> book positions) is packed into one
+# shared-memory segment. Each worker process attaches to it once and scans
+# its own slice of the vocabulary, so a query only pickles the query tokens
+# and a (lo, hi) range, never the catalog itself.
+
+MAX_DISTANCE = 2
+
+# per-worker cache: segment name -> (shm, vocab slice cache, arrays)
+_attached = {}
+
+# Workers must not be forked from the App: by the time the pool is used the
+# process runs Tk and task threads, and forking that can deadlock.
+_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+def _views(buf, layout):
+    """Typed memoryviews over the packed segment (see ShardedIndex._pack)."""
+    out = []
+    for offset, length, code in layout:
+        size = array(code).itemsize
+        out.append(buf[offset:offset + length * size].cast(code) if code != "B"
+                   else buf[offset:offset + length])
+    return out
+
+
+def _attach(name, layout):
+    entry = _attached.get(name)
+    if entry is None:
+        # an index was rebuilt: drop the old segment in this worker
+        for old in list(_attached):
+            old_shm, _, views = _attached.pop(old)
+            for v in views:
+                v.release()
+            old_shm.close()
+        shm = shared_memory.SharedMemory(name=name)
+        entry = (shm, {}, _views(shm.buf, layout))
+        _attached[name] = entry
+    return entry
+
+
+def _words(entry, lo, hi):
+    shm, cache, (vocab_ptr, vocab_blob, _, _) = entry
+    words = cache.get((lo, hi))
+    if words is None:
+        words = [bytes(vocab_blob[vocab_ptr[i]:vocab_ptr[i + 1]]).decode("utf-8") for i in range(lo, hi)]
+        cache[(lo, hi)] = words
+    return words
+
+
+def _match_range(words, post_ptr, postings, lo, query_tokens):
+    """{book position: best edit distance} for vocabulary words lo..lo+len(words)."""
+    hits = {}
+    for i, kw in enumerate(words):
+        best = None
+        for q in query_tokens:
+            if abs(len(q) - len(kw)) > MAX_DISTANCE:   # cheap lower bound on edit distance
+                continue
+            d = edit_distance(q, kw)
+            if d <= MAX_DISTANCE and (best is None or d < best):
+                best = d
+                if d == 0:
+                    break
+        if best is None:
+            continue
+        k = lo + i
+        for p in postings[post_ptr[k]:post_ptr[k + 1]]:
+            if best < hits.get(p, MAX_DISTANCE + 1):
+                hits[p] = best
+    return hits
+
+
+def _search_shard(name, layout, lo, hi, query_tokens):
+    entry = _attach(name, layout)
+    _, _, (_, _, post_ptr, postings) = entry
+    return _match_range(_words(entry, lo, hi), post_ptr, postings, lo, query_tokens)
+
+
+class ShardedIndex:
+    """Fuzzy keyword index over a `books` dict, searched by a process pool.
+
+    Results match search_books_logic (any query token within edit distance 2
+    of any keyword) but are ranked by best distance, then catalog order. The
+    index is a snapshot: call rebuild() after books are added. `version` is
+    the caller's catalog version at build time, kept so it can tell when the
+    index is stale. Use workers=0 to search in-process (handy as a baseline).
+    """
+
+    def __init__(self, books, workers=None, version=None):
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self._pool = None
+        if self.workers:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                             mp_context=multiprocessing.get_context(_START_METHOD))
+        self._shm = None
+        self._local = None
+        self.rebuild(books, version)
+
+    def start(self):
+        """Start every worker process now instead of on the first query."""
+        if self._pool is not None:
+            for f in [self._pool.submit(os.getpid) for _ in range(self.workers)]:
+                f.result()
+
+    def __len__(self):
+        return len(self.book_ids)
+
+    def rebuild(self, books, version=None):
+        self.version = version
+        postings_by_kw = {}
+        self.book_ids = []
+        for pos, (book_id, info) in enumerate(list(books.items())):
+            self.book_ids.append(book_id)
+            for kw in info['keywords']:
+                postings_by_kw.setdefault(kw, []).append(pos)
+
+        self._release()
+        if self._pool is None:
+            # in-process: no segment needed, keep plain lists
+            self.vocab_size = len(postings_by_kw)
+            post_ptr, postings = [0], []
+            for plist in postings_by_kw.values():
+                postings.extend(plist)
+                post_ptr.append(len(postings))
+            self._local = (list(postings_by_kw), post_ptr, postings)
+            self.shards = [(0, self.vocab_size)]
+            return
+
+        vocab_blob = bytearray()
+        vocab_ptr = array("q", [0])
+        post_ptr = array("q", [0])
+        postings = array("i")
+        for kw, plist in postings_by_kw.items():
+            vocab_blob += kw.encode("utf-8")
+            vocab_ptr.append(len(vocab_blob))
+            postings.extend(plist)
+            post_ptr.append(len(postings))
+        self.vocab_size = len(postings_by_kw)
+
+        self._shm, self._layout = self._pack([
+            (vocab_ptr, "q"), (vocab_blob, "B"), (post_ptr, "q"), (postings, "i")])
+
+        # contiguous vocabulary slices, one per worker
+        n = max(1, self.workers)
+        step = -(-self.vocab_size // n) if self.vocab_size else 1
+        self.shards = [(lo, min(lo + step, self.vocab_size)) for lo in range(0, self.vocab_size, step)]
+
+    @staticmethod
+    def _pack(parts):
+        layout, offset = [], 0
+        for data, code in parts:
+            size = array(code).itemsize
+            offset = -(-offset // 8) * 8     # keep every array 8-byte aligned
+            layout.append((offset, len(data), code))
+            offset += len(data) * size
+        shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        for (data, _), (start, length, code) in zip(parts, layout):
+            raw = memoryview(data).cast("B")
+            shm.buf[start:start + len(raw)] = raw
+            raw.release()
+        return shm, tuple(layout)
+
+    def search(self, query_tokens):
+        """Return [(book_id, best_distance)] for the tokenized query."""
+        if not query_tokens or not self.vocab_size:
+            return []
+        query_tokens = list(query_tokens)
+        if self._pool is None:
+            partials = [_match_range(*self._local, 0, query_tokens)]
+        else:
+            futures = [self._pool.submit(_search_shard, self._shm.name, self._layout, lo, hi, query_tokens)
+                       for lo, hi in self.shards]
+            partials = [f.result() for f in futures]
+
+        merged = {}
+        for hits in partials:
+            for pos, d in hits.items():
+                if d < merged.get(pos, MAX_DISTANCE + 1):
+                    merged[pos] = d
+        return [(self.book_ids[pos], d) for pos, d in sorted(merged.items(), key=lambda kv: (kv[1], kv[0]))]
+
+    def _release(self):
+        self._local = None
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def close(self):
+        # no search is running (the caller serialises them), so don't wait for idle workers to exit
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        self._release()
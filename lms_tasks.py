@@ -0,0 +1,161 @@
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, CancelledError
+
+
+# ===========================
+# Background tasks for the Tk App
+# ===========================
+# Work runs on a thread (or process) pool; every callback is marshalled back
+# onto the Tk mainloop through root.after, so widgets are only ever touched
+# from the UI thread.
+
+# Process workers are started through a forkserver (or spawned), never forked
+# from the Tk process: forking a process that runs Tk and worker threads can
+# deadlock the child.
+_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+class TaskCancelled(Exception):
+    """Raised inside a task function when its Task has been cancelled."""
+
+
+class Task:
+    """Handle passed to thread tasks: report progress, check for cancellation."""
+
+    def __init__(self, runner, name):
+        self.runner = runner
+        self.name = name
+        self.future = None
+        self._cancel = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def cancel(self):
+        self._cancel.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    def check(self):
+        """Raise TaskCancelled if cancel() was called (call this inside loops)."""
+        if self._cancel.is_set():
+            raise TaskCancelled(self.name)
+
+    def report(self, done, total=None, message=None):
+        self.runner._events.put(("progress", self, (done, total, message)))
+
+
+class TaskRunner:
+    """Submit work off the UI thread and get results back via root.after.
+
+    submit(fn, *args) calls fn(task, *args) on a worker thread, where task is a
+    Task handle. With process=True, fn(*args) runs in a process pool instead;
+    it must be picklable, cannot report progress and can only be cancelled
+    before it starts.
+    """
+
+    POLL_MS = 40
+
+    def __init__(self, root, max_workers=4, on_status=None):
+        self.root = root
+        self.on_status = on_status      # on_status(busy, done, total, message)
+        self._threads = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="lms-task")
+        self._processes = None
+        self._max_workers = max_workers
+        self._events = queue.Queue()
+        self._callbacks = {}
+        self.active = []
+        self._closed = False
+        self.root.after(self.POLL_MS, self._poll)
+
+    def submit(self, fn, *args, name="Working", on_done=None, on_error=None,
+               on_progress=None, on_cancel=None, process=False):
+        task = Task(self, name)
+        self._callbacks[task] = (on_done, on_error, on_progress, on_cancel)
+        if process:
+            if self._processes is None:
+                self._processes = ProcessPoolExecutor(max_workers=self._max_workers,
+                                                      mp_context=multiprocessing.get_context(_START_METHOD))
+            task.future = self._processes.submit(fn, *args)
+        else:
+            task.future = self._threads.submit(self._run, task, fn, args)
+        task.future.add_done_callback(lambda f, t=task: self._events.put(("finished", t, f)))
+        self.active.append(task)
+        self._status(True, 0, None, name)
+        return task
+
+    def cancel_all(self):
+        for task in list(self.active):
+            task.cancel()
+
+    def shutdown(self):
+        self._closed = True
+        self.cancel_all()
+        self._threads.shutdown(wait=False, cancel_futures=True)
+        if self._processes is not None:
+            self._processes.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _run(task, fn, args):
+        task.check()
+        return fn(task, *args)
+
+    def _status(self, busy, done, total, message):
+        if self.on_status:
+            self.on_status(busy, done, total, message)
+
+    def _settle(self, message):
+        # only report idle once nothing is left; otherwise show what is still running
+        if self.active:
+            self._status(True, 0, None, self.active[-1].name)
+        else:
+            self._status(False, 0, None, message)
+
+    def _poll(self):
+        try:
+            while True:
+                kind, task, payload = self._events.get_nowait()
+                if kind == "progress":
+                    self._progress(task, payload)
+                else:
+                    self._finish(task, payload)
+        except queue.Empty:
+            pass
+        if not self._closed:
+            self.root.after(self.POLL_MS, self._poll)
+
+    def _progress(self, task, payload):
+        if task.cancelled or task not in self._callbacks:
+            return
+        on_progress = self._callbacks[task][2]
+        if on_progress:
+            on_progress(*payload)
+        self._status(True, *payload)
+
+    def _finish(self, task, future):
+        on_done, on_error, _, on_cancel = self._callbacks.pop(task, (None,) * 4)
+        if task in self.active:
+            self.active.remove(task)
+        try:
+            result = future.result()
+        except (CancelledError, TaskCancelled):
+            if on_cancel:
+                on_cancel()
+            self._settle(f"{task.name} cancelled")
+            return
+        except Exception as e:
+            if on_error:
+                on_error(e)
+            self._settle(f"{task.name} failed: {e}")
+            return
+        if task.cancelled:
+            # finished anyway, but nobody wants the result any more
+            if on_cancel:
+                on_cancel()
+            self._settle(f"{task.name} cancelled")
+            return
+        self._settle("Ready")
+        if on_done:
+            on_done(result)
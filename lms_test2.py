@@ -1,11 +1,20 @@
+import itertools
+import os
+import threading
+from collections import deque
 import tkinter as tk
-from tkinter import ttk, messagebox, simpledialog
+from tkinter import ttk, messagebox, simpledialog, filedialog
 import nltk
 from nltk.sentiment import SentimentIntensityAnalyzer
 from nltk.tokenize import word_tokenize
 from nltk.corpus import stopwords
 from nltk.metrics import edit_distance
 
+from lms_tasks import TaskRunner
+from lms_query import FieldIndex, is_structured
+from lms_dedup import DuplicateIndex, signature
+import lms_export
+
 
 nltk.download('vader_lexicon')
 nltk.download('punkt')
@@ -18,37 +27,218 @@ sia = SentimentIntensityAnalyzer()
 books = {}      
 borrowers = {} 
 
+# Case-insensitive ID indexes (lowercased ID -> ID) for O(1) scanner/ID lookups
+_book_ids_ci = {}
+_borrower_ids_ci = {}
+
+# Change tracking: the *_logic functions bump a store's version whenever they
+# modify it, so cached views know when they are stale. 'catalog' only moves
+# when books are added, which is what the search indexes care about.
+data_version = {'books': 0, 'borrowers': 0, 'reviews': 0, 'catalog': 0}
+
+def _mark_changed(*stores):
+    for store in stores:
+        data_version[store] += 1
+
+def _tokens(text):
+    return [w.lower() for w in word_tokenize(text) if w.lower() not in stop_words]
+
+# Per-field indexes for structured queries (author:rowling available:yes ...)
+_field_index = FieldIndex(_tokens)
+
+# MinHash/LSH index used to flag likely duplicate titles on ingest
+_dup_index = DuplicateIndex(_tokens)
+
+# Optional multi-process search (see enable_sharded_search); off by default
+SHARD_MIN_BOOKS = 5000
+_sharded_index = None
+_shard_lock = threading.Lock()
+
+
+class HoldQueue:
+    """FIFO of patron holds on one title.
+
+    Entries are [hold_id, borrower_id, active] lists in a deque. cancel()
+    finds its entry through the hold_id index and just clears the flag;
+    pop_next() drops cancelled entries as it reaches them. Every operation
+    is (amortised) O(1).
+    """
+    _ids = itertools.count(1)
+
+    def __init__(self):
+        self._queue = deque()
+        self._by_id = {}
+        self._by_borrower = {}
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def __iter__(self):
+        return (entry[1] for entry in self._queue if entry[2])
+
+    def entries(self):
+        """(hold_id, borrower_id) of the active holds, oldest first."""
+        return [(entry[0], entry[1]) for entry in self._queue if entry[2]]
+
+    def hold_for(self, borrower_id):
+        """hold_id of borrower_id's hold on this title, or None."""
+        return self._by_borrower.get(borrower_id)
+
+    def place(self, borrower_id):
+        entry = [next(self._ids), borrower_id, True]
+        self._queue.append(entry)
+        self._by_id[entry[0]] = entry
+        self._by_borrower[borrower_id] = entry[0]
+        return entry[0]
+
+    def cancel(self, hold_id):
+        entry = self._by_id.pop(hold_id, None)
+        if entry is None:
+            return False
+        entry[2] = False
+        del self._by_borrower[entry[1]]
+        return True
+
+    def pop_next(self):
+        """Remove and return the borrower_id of the oldest active hold (None if empty)."""
+        while self._queue:
+            hold_id, borrower_id, active = self._queue.popleft()
+            if active:
+                del self._by_id[hold_id]
+                del self._by_borrower[borrower_id]
+                return borrower_id
+        return None
 
 
-def add_book_logic(book_id, title, author):
+def add_book_logic(book_id, title, author, copies=1):
     if not book_id or not title or not author:
         messagebox.showerror("Error", "Please complete all fields.")
         return False
 
+    try:
+        copies = int(copies)
+    except (TypeError, ValueError):
+        copies = 0
+    if copies < 1:
+        messagebox.showerror("Error", "Copies must be a whole number of at least 1.")
+        return False
+
     if book_id in books:
         messagebox.showerror("Error", "Book ID already exists!")
         return False
 
-    title_tokens = [w.lower() for w in word_tokenize(title) if w.lower() not in stop_words]
-    author_tokens = [w.lower() for w in word_tokenize(author) if w.lower() not in stop_words]
+    title_tokens = _tokens(title)
+    author_tokens = _tokens(author)
     keywords = set(title_tokens + author_tokens)
 
+    sig = signature(keywords)
+    dups = [d for d in _dup_index.candidates(title_tokens, author_tokens, sig) if d[0] in books]
+    if dups:
+        listing = "\n".join(f"• {b_id}: '{books[b_id]['title']}' by {books[b_id]['author']}" for b_id, _ in dups[:5])
+        if not messagebox.askyesno("Possible duplicate",
+                                   f"'{title}' by {author} looks like:\n\n{listing}\n\nAdd it anyway?"):
+            return False
+
+    _insert_book(book_id, title, author, copies, title_tokens, author_tokens, keywords, sig)
+    return True
+
+def add_books_bulk_logic(records, allow_duplicates=False):
+    """Headless bulk import of (book_id, title, author[, copies]) records.
+
+    Each record is checked against the LSH index (which already holds the
+    records added earlier in the batch). Likely duplicates are skipped unless
+    allow_duplicates is set. Returns (added_ids, flagged, errors), where
+    flagged is [(book_id, [(existing_id, similarity)])] and errors is
+    [(record, reason)].
+    """
+    added, flagged, errors = [], [], []
+    for record in records:
+        book_id, title, author, *rest = record
+        copies = rest[0] if rest else 1
+        if not book_id or not title or not author:
+            errors.append((record, "Missing fields"))
+            continue
+        if book_id in books:
+            errors.append((record, "Book ID already exists"))
+            continue
+        try:
+            copies = int(copies)
+        except (TypeError, ValueError):
+            copies = 0
+        if copies < 1:
+            errors.append((record, "Copies must be at least 1"))
+            continue
+        title_tokens = _tokens(title)
+        author_tokens = _tokens(author)
+        keywords = set(title_tokens + author_tokens)
+        sig = signature(keywords)
+        dups = _dup_index.candidates(title_tokens, author_tokens, sig)
+        if dups:
+            flagged.append((book_id, dups))
+            if not allow_duplicates:
+                continue
+        _insert_book(book_id, title, author, copies, title_tokens, author_tokens, keywords, sig, mark=False)
+        added.append(book_id)
+    if added:
+        _mark_changed('books')
+    return added, flagged, errors
+
+def duplicate_report_logic(task=None):
+    """Groups of likely duplicate book IDs across the whole catalog (see lms_dedup)."""
+    if len(_dup_index) != len(books):
+        _dup_index.rebuild(books)
+    return _dup_index.report(task)
+
+def _insert_book(book_id, title, author, copies, title_tokens, author_tokens, keywords, sig, mark=True):
+    # books first: a search that rebuilds the indexes in between picks the
+    # book up from here, and the index adds below then do nothing
     books[book_id] = {
         'title': title,
         'author': author,
         'available': True,
+        'copies': copies,       # total copies owned
+        'free': copies,         # on the shelf, free for anyone
+        'held_for': set(),      # borrower_ids with a returned copy set aside for them
+        'holds': HoldQueue(),
         'reviews': [],
         'keywords': keywords
     }
-    return True
-
-def search_books_logic(query):
+    _book_ids_ci[book_id.lower()] = book_id
+    _field_index.add(book_id, title_tokens, author_tokens)
+    _dup_index.add(book_id, title_tokens, author_tokens, sig)
+    _mark_changed('catalog')
+    if mark:
+        _mark_changed('books')
+
+def search_books_logic(query, task=None):
+    """Fuzzy keyword search, or a field query (see lms_query) if the query uses a field:value term.
+
+    Pass a lms_tasks.Task to run it off the UI thread. Bad field-query syntax
+    raises lms_query.QueryError.
+    """
     if not query:
         return []
+    if is_structured(query):
+        if len(_field_index) != len(books):
+            _field_index.rebuild(books)
+        if task:
+            task.check()
+        return [(book_id, books[book_id]) for book_id in _field_index.search(query)]
 
     query_tokens = [w.lower() for w in word_tokenize(query) if w.lower() not in stop_words]
+    if _sharded_index is not None and len(books) >= SHARD_MIN_BOOKS:
+        results = _search_sharded(query_tokens, task)
+        if results is not None:
+            return results
+    return _search_linear(query_tokens, task)
+
+def _search_linear(query_tokens, task=None):
     results = []
-    for book_id, info in books.items():
+    catalog = list(books.items())   # snapshot: safe to iterate while the UI edits books
+    for n, (book_id, info) in enumerate(catalog):
+        if task and n % 200 == 0:
+            task.check()
+            task.report(n, len(catalog), "Searching")
         if not info['keywords']:
             continue
         # if any query token is within edit distance <=2 of any keyword
@@ -56,16 +246,55 @@ def search_books_logic(query):
             results.append((book_id, info))
     return results
 
-def add_review_logic(book_id, review_text):
+def enable_sharded_search(workers=None):
+    """Fan fuzzy search out over a process pool for catalogs of SHARD_MIN_BOOKS or more."""
+    global _sharded_index
+    from lms_shard import ShardedIndex
+    disable_sharded_search()
+    with _shard_lock:
+        _sharded_index = ShardedIndex(books, workers, version=data_version['catalog'])
+        _sharded_index.start()
+    return _sharded_index
+
+def disable_sharded_search():
+    global _sharded_index
+    # detach under the lock (waits for a running sharded search), shut the pool down outside it
+    with _shard_lock:
+        index, _sharded_index = _sharded_index, None
+    if index is not None:
+        index.close()
+
+def _search_sharded(query_tokens, task=None):
+    """Sharded fuzzy search; None if sharding was switched off meanwhile (caller scans in-process)."""
+    if task:
+        task.check()
+        task.report(0, None, "Searching (sharded)")
+    with _shard_lock:
+        index = _sharded_index
+        if index is None:
+            return None
+        version = data_version['catalog']     # read before the snapshot: a racing add just means another rebuild
+        if index.version != version:
+            index.rebuild(books, version)
+        hits = index.search(query_tokens)
+    return [(book_id, books[book_id]) for book_id, _ in hits if book_id in books]
+
+def score_review(review_text):
+    sentiment = sia.polarity_scores(review_text)['compound']
+    return "Positive" if sentiment > 0 else ("Negative" if sentiment < 0 else "Neutral")
+
+def add_review_logic(book_id, review_text, label=None):
+    """Store a review; label can be pre-computed with score_review (e.g. in a background task)."""
     if book_id not in books:
         messagebox.showerror("Error", "Book not found!")
         return None
     if not review_text:
         messagebox.showerror("Error", "Review cannot be empty.")
         return None
-    sentiment = sia.polarity_scores(review_text)['compound']
-    label = "Positive" if sentiment > 0 else ("Negative" if sentiment < 0 else "Neutral")
+    if label is None:
+        label = score_review(review_text)
     books[book_id]['reviews'].append((review_text, label))
+    _mark_changed('reviews')
     return label
 
 def add_borrower_logic(borrower_id, name):
@@ -81,6 +310,8 @@ def add_borrower_logic(borrower_id, name):
         'name_tokens': name_tokens,
         'borrowed_books': []
     }
+    _borrower_ids_ci[borrower_id.lower()] = borrower_id
+    _mark_changed('borrowers')
     return True
 
 def _resolve_borrower_id(user_input):
@@ -88,6 +319,8 @@ def _resolve_borrower_id(user_input):
     if not user_input:
         return None
     s = user_input.lower()
+    if s in _borrower_ids_ci:
+        return _borrower_ids_ci[s]
     for b_id, info in borrowers.items():
         if s == b_id.lower():
             return b_id
@@ -101,6 +334,8 @@ def _resolve_book_id(user_input):
     if not user_input:
         return None
     s = user_input.lower()
+    if s in _book_ids_ci:
+        return _book_ids_ci[s]
     for b_id, info in books.items():
         if s == b_id.lower():
             return b_id
@@ -109,6 +344,34 @@ def _resolve_book_id(user_input):
                 return b_id
     return None
 
+def _checkout(borrower_id, book_id):
+    # caller has checked that a copy is free or set aside for this borrower
+    book = books[book_id]
+    if borrower_id in book['held_for']:
+        book['held_for'].remove(borrower_id)  # collect the copy set aside for them
+    else:
+        book['free'] -= 1
+    book['available'] = book['free'] > 0
+    _field_index.set_available(book_id, book['available'])
+    borrowers[borrower_id]['borrowed_books'].append(book_id)
+
+def _checkin(borrower_id, book_id):
+    """Return one copy; gives it to the next hold if any and returns that borrower_id."""
+    borrowers[borrower_id]['borrowed_books'].remove(book_id)
+    return _pass_on(book_id)
+
+def _pass_on(book_id):
+    # a copy came back to the desk: set it aside for the next hold, else shelve it
+    book = books[book_id]
+    next_id = book['holds'].pop_next()
+    if next_id is None:
+        book['free'] += 1
+    else:
+        book['held_for'].add(next_id)         # the returned copy goes to the next hold
+    book['available'] = book['free'] > 0
+    _field_index.set_available(book_id, book['available'])
+    return next_id
+
 def borrow_book_logic():
     borrower_input = simpledialog.askstring("Borrower", "Enter Borrower Name or ID:")
     borrower_id = _resolve_borrower_id(borrower_input)
@@ -122,12 +385,21 @@ def borrow_book_logic():
         messagebox.showerror("Error", "Book not found!")
         return None, None
 
-    if not books[book_id]['available']:
-        messagebox.showerror("Error", "Book is already borrowed!")
+    book = books[book_id]
+    if book_id in borrowers[borrower_id]['borrowed_books']:
+        messagebox.showerror("Error", "This borrower already has a copy of this book!")
         return None, None
 
-    books[book_id]['available'] = False
-    borrowers[borrower_id]['borrowed_books'].append(book_id)
+    if not book['free'] and borrower_id not in book['held_for']:
+        if book['holds'].hold_for(borrower_id):
+            messagebox.showerror("Error", "All copies are borrowed! This borrower is already in the holds queue.")
+        elif messagebox.askyesno("All copies borrowed",
+                                 f"All copies of '{book['title']}' are out. Place a hold for '{borrowers[borrower_id]['name']}'?"):
+            place_hold_logic(borrower_id, book_id)
+        return None, None
+
+    _checkout(borrower_id, book_id)
+    _mark_changed('books', 'borrowers')
     messagebox.showinfo("Success", f"Book '{books[book_id]['title']}' borrowed by '{borrowers[borrower_id]['name']}'")
     return borrower_id, book_id
 
@@ -148,11 +420,125 @@ def return_book_logic():
         messagebox.showerror("Error", "This borrower did not borrow this book!")
         return None, None
 
-    borrowers[borrower_id]['borrowed_books'].remove(book_id)
-    books[book_id]['available'] = True
-    messagebox.showinfo("Success", f"Book '{books[book_id]['title']}' returned by '{borrowers[borrower_id]['name']}'")
+    book = books[book_id]
+    next_id = _checkin(borrower_id, book_id)
+    _mark_changed('books', 'borrowers')
+    msg = f"Book '{book['title']}' returned by '{borrowers[borrower_id]['name']}'"
+    if next_id is not None:
+        msg += f"\nSet aside for '{borrowers[next_id]['name']}' (next hold)."
+    messagebox.showinfo("Success", msg)
     return borrower_id, book_id
 
+def _batch_errors(borrower_id, scans, checkout):
+    """Validate a scan batch without changing anything: [(scanned, reason)] and the resolved IDs."""
+    errors, book_ids, seen = [], [], set()
+    loans = set(borrowers[borrower_id]['borrowed_books'])
+    for scanned in scans:
+        book_id = _book_ids_ci.get(str(scanned).strip().lower())
+        if book_id is None:
+            errors.append((scanned, "Unknown book ID"))
+        elif book_id in seen:
+            errors.append((scanned, "Scanned twice"))
+        elif checkout and book_id in loans:
+            errors.append((scanned, "Already borrowed by this borrower"))
+        elif checkout and not books[book_id]['free'] and borrower_id not in books[book_id]['held_for']:
+            errors.append((scanned, "No copy available"))
+        elif not checkout and book_id not in loans:
+            errors.append((scanned, "Not borrowed by this borrower"))
+        else:
+            seen.add(book_id)
+            book_ids.append(book_id)
+    return errors, book_ids
+
+def batch_checkout_logic(borrower_id, scans):
+    """Check out every scanned book ID to one borrower, all or nothing.
+
+    Returns (book_ids, errors): on any error nothing is committed and errors
+    lists (scanned, reason) pairs. No dialogs are shown.
+    """
+    if borrower_id not in borrowers:
+        return [], [(borrower_id, "Borrower not found")]
+    errors, book_ids = _batch_errors(borrower_id, scans, checkout=True)
+    if errors or not book_ids:
+        return [], errors
+    for book_id in book_ids:
+        _checkout(borrower_id, book_id)
+    _mark_changed('books', 'borrowers')
+    return book_ids, []
+
+def batch_return_logic(borrower_id, scans):
+    """Return every scanned book ID for one borrower, all or nothing (see batch_checkout_logic).
+
+    Returns (book_ids, errors, set_aside), where set_aside is [(book_id,
+    next_borrower_id)] for the copies that go to the hold shelf.
+    """
+    if borrower_id not in borrowers:
+        return [], [(borrower_id, "Borrower not found")], []
+    errors, book_ids = _batch_errors(borrower_id, scans, checkout=False)
+    if errors or not book_ids:
+        return [], errors, []
+    set_aside = []
+    for book_id in book_ids:
+        next_id = _checkin(borrower_id, book_id)
+        if next_id is not None:
+            set_aside.append((book_id, next_id))
+    _mark_changed('books', 'borrowers')
+    return book_ids, [], set_aside
+
+def place_hold_logic(borrower_id, book_id):
+    """Queue borrower_id for the next returned copy; returns the hold_id (None on error)."""
+    if borrower_id not in borrowers or book_id not in books:
+        messagebox.showerror("Error", "Borrower or book not found!")
+        return None
+    book = books[book_id]
+    if book_id in borrowers[borrower_id]['borrowed_books']:
+        messagebox.showerror("Error", "This borrower already has a copy of this book!")
+        return None
+    if book['free'] > 0:
+        messagebox.showerror("Error", "A copy is on the shelf; borrow it instead of placing a hold.")
+        return None
+    if book['holds'].hold_for(borrower_id) or borrower_id in book['held_for']:
+        messagebox.showerror("Error", "This borrower already has a hold on this book!")
+        return None
+    hold_id = book['holds'].place(borrower_id)
+    _mark_changed('books')
+    messagebox.showinfo("Hold placed", f"Hold {hold_id}: '{borrowers[borrower_id]['name']}' is #{len(book['holds'])} in the queue for '{book['title']}'.")
+    return hold_id
+
+def cancel_hold_logic(book_id, hold_id):
+    if book_id not in books or not books[book_id]['holds'].cancel(hold_id):
+        messagebox.showerror("Error", "Hold not found!")
+        return False
+    _mark_changed('books')
+    return True
+
+def release_held_copy_logic(book_id, borrower_id):
+    """Take back the copy set aside for borrower_id (not collected): it goes to the next hold or the shelf."""
+    if book_id not in books or borrower_id not in books[book_id]['held_for']:
+        messagebox.showerror("Error", "No copy is set aside for this borrower!")
+        return False
+    book = books[book_id]
+    book['held_for'].remove(borrower_id)
+    next_id = _pass_on(book_id)
+    _mark_changed('books')
+    if next_id is None:
+        messagebox.showinfo("Copy released", f"'{book['title']}' is back on the shelf.")
+    else:
+        messagebox.showinfo("Copy released", f"'{book['title']}' is now set aside for '{borrowers[next_id]['name']}' (next hold).")
+    return True
+
+def availability(info):
+    """(text, fg, bg) for a book's availability pill; O(1), from the copy counters."""
+    if info['free']:
+        text = "Available" if info['copies'] == 1 else f"{info['free']} of {info['copies']} available"
+        return text, "#065f46", "#d1fae5"
+    text = "Borrowed"
+    if info['held_for']:
+        text += f" · {len(info['held_for'])} on hold shelf"
+    if info['holds']:
+        text += f" · {len(info['holds'])} waiting"
+    return text, "#92400e", "#ffedd5"
+
 # ===========================
 # Modern UI App
 # ===========================
@@ -169,6 +555,14 @@ class App:
         # top
         self._build_topbar()
 
+        # background tasks + status strip
+        self._build_statusbar()
+        self.tasks = TaskRunner(self.root, on_status=self._on_task_status)
+        self.root.protocol("WM_DELETE_WINDOW", self._quit)
+        self._search_task = None
+        self._book_list_job = None
+        self._home_job = None
+
         # sidebar
         self._build_sidebar()
 
@@ -179,6 +573,10 @@ class App:
         self.book_tree = None
         self.borrower_tree = None
 
+        # Built views are cached here and raised on navigation: name -> (frame, data versions)
+        self._views = {}
+        self._current_view = None
+
         # Default view
         self.show_home()
 
@@ -241,12 +639,79 @@ class App:
         side_btn("🛠️  Manage", self.show_manage)
         side_btn("➕  Issue Book", self.show_issue_book)
         side_btn("👤  Add Borrower", self.show_add_borrower)
-        side_btn("🚪  Logout", self.root.quit)
+        side_btn("🚪  Logout", self._quit)
+
+    #  Status strip (progress of background tasks)
+    def _build_statusbar(self):
+        bar = tk.Frame(self.root, bg="white", height=30, highlightthickness=1, highlightbackground="#e5e7eb")
+        bar.pack(side="bottom", fill="x")
+
+        self.status_var = tk.StringVar(value="Ready")
+        tk.Label(bar, textvariable=self.status_var, font=("Segoe UI", 9), bg="white", fg="#6b7280").pack(side="left", padx=12)
+
+        self.cancel_btn = ttk.Button(bar, text="Cancel", style="Ghost.TButton", command=self._cancel_tasks)
+        self.progress = ttk.Progressbar(bar, mode="determinate", length=220)
+
+    def _on_task_status(self, busy, done, total, message):
+        self.status_var.set(message or "Working")
+        if not busy:
+            self.progress.stop()
+            self.progress.pack_forget()
+            self.cancel_btn.pack_forget()
+            return
+        if not self.progress.winfo_ismapped():
+            self.cancel_btn.pack(side="right", padx=8, pady=2)
+            self.progress.pack(side="right", padx=8, pady=4)
+        if total:
+            self.progress.stop()
+            self.progress.configure(mode="determinate", maximum=total, value=done)
+        elif str(self.progress.cget("mode")) != "indeterminate":
+            self.progress.configure(mode="indeterminate")
+            self.progress.start(15)
+
+    def _cancel_tasks(self):
+        self.tasks.cancel_all()
+        if self._book_list_job:
+            self.root.after_cancel(self._book_list_job)
+            self._book_list_job = None
+            self._book_list_done("Cancelled")
+        if self._home_job:
+            self.root.after_cancel(self._home_job)
+            self._home_job = None
+            self._book_list_done("Cancelled")
+
+    def _quit(self):
+        self.tasks.shutdown()
+        disable_sharded_search()
+        self.root.quit()
 
     # Helpers
-    def _clear_main(self):
-        for w in self.main.winfo_children():
-            w.destroy()
+    def _view(self, name, deps=(), refresh=None):
+        """Hide the current view and show the cached frame for `name`.
+
+        Returns the emptied frame when the view must be (re)built, or None when
+        its widgets are still current. deps are the data_version stores the
+        view displays (None = always rebuild); a stale view calls refresh()
+        if given instead of being rebuilt.
+        """
+        if self._current_view is not None:
+            self._current_view.pack_forget()
+
+        frame, seen = self._views.get(name, (None, None))
+        versions = None if deps is None else {d: data_version[d] for d in deps}
+        build = frame is None or versions is None or (seen != versions and refresh is None)
+        if frame is None:
+            frame = tk.Frame(self.main, bg="#f5f6fa")
+        elif build:
+            for w in frame.winfo_children():
+                w.destroy()
+        elif seen != versions:
+            refresh()
+
+        self._views[name] = (frame, versions)
+        frame.pack(fill="both", expand=True)
+        self._current_view = frame
+        return frame if build else None
 
     def _section_title(self, parent, text):
         tk.Label(parent, text=text, font=("Segoe UI", 16, "bold"), bg="#f5f6fa", fg="#111827").pack(anchor="w", padx=20, pady=16)
@@ -260,12 +725,28 @@ class App:
         lab = tk.Label(parent, text=text, bg=bg, fg=fg, font=("Segoe UI", 9, "bold"))
         lab.pack(side="left", padx=4, pady=2, ipadx=6, ipady=2)
 
+    def _circulation_buttons(self, parent, book_id, info):
+        # Borrow stays enabled while a copy is set aside for a hold, so its patron can collect it
+        ttk.Button(parent, text="Borrow", style="Primary.TButton",
+                   state=("normal" if info['available'] or info['held_for'] else "disabled"),
+                   command=lambda b=book_id: self._borrow_and_refresh(b)).pack(side="left", padx=4)
+        if not info['available']:
+            ttk.Button(parent, text="Place Hold", style="Ghost.TButton",
+                       command=lambda b=book_id: self._hold_and_refresh(b)).pack(side="left", padx=4)
+
     #  Views 
+    HOME_CARD_CHUNK = 50
+
     def show_home(self):
-        self._clear_main()
-        self._section_title(self.main, "📌 Recommended / All Books")
+        view = self._view("home", ('books',))
+        if view is None:
+            return
+        if self._home_job:
+            self.root.after_cancel(self._home_job)
+            self._home_job = None
+        self._section_title(view, "📌 Recommended / All Books")
 
-        container = tk.Frame(self.main, bg="#f5f6fa")
+        container = tk.Frame(view, bg="#f5f6fa")
         container.pack(fill="both", expand=True)
 
         if not books:
@@ -273,40 +754,55 @@ class App:
                      font=("Segoe UI", 11), bg="#f5f6fa", fg="#6b7280").pack(pady=20)
             return
 
-        for book_id, info in books.items():
-            card = self._card(container)
-
-            header = tk.Frame(card, bg="white")
-            header.pack(fill="x", padx=12, pady=10)
-
-            # Title + author
-            title = tk.Label(header, text=info['title'], font=("Segoe UI", 13, "bold"), bg="white", fg="#111827")
-            title.pack(anchor="w")
-            tk.Label(header, text=f"by {info['author']}", font=("Segoe UI", 10), bg="white", fg="#6b7280").pack(anchor="w")
+        self._add_home_cards(container, list(books.items()), 0)
 
-            # Availability pill
-            pill_wrap = tk.Frame(header, bg="white")
-            pill_wrap.pack(anchor="e")
-            if info['available']:
-                self._pill(pill_wrap, "Available", fg="#065f46", bg="#d1fae5")
-            else:
-                self._pill(pill_wrap, "Borrowed", fg="#92400e", bg="#ffedd5")
-
-            # Actions
-            actions = tk.Frame(card, bg="#f9fafb")
-            actions.pack(fill="x", padx=12, pady=10)
-
-            ttk.Button(actions, text="View Details", style="Ghost.TButton",
-                       command=lambda b=book_id: self.open_book_details(b)).pack(side="left", padx=4)
-            ttk.Button(actions, text="Borrow", style="Primary.TButton",
-                       state=("normal" if info['available'] else "disabled"),
-                       command=lambda b=book_id: self._borrow_and_refresh(b)).pack(side="left", padx=4)
+    def _add_home_cards(self, container, catalog, start):
+        # like _insert_book_rows: a card is a dozen widgets, so build them a
+        # chunk at a time and let the window repaint in between
+        self._home_job = None
+        if not container.winfo_exists():
+            return
+        end = min(start + self.HOME_CARD_CHUNK, len(catalog))
+        for book_id, info in catalog[start:end]:
+            self._home_card(container, book_id, info)
+        if end < len(catalog):
+            self._on_task_status(True, end, len(catalog), "Loading books")
+            self._home_job = self.root.after(1, self._add_home_cards, container, catalog, end)
+        elif start:
+            self._book_list_done("Ready")
+
+    def _home_card(self, container, book_id, info):
+        card = self._card(container)
+
+        header = tk.Frame(card, bg="white")
+        header.pack(fill="x", padx=12, pady=10)
+
+        # Title + author
+        title = tk.Label(header, text=info['title'], font=("Segoe UI", 13, "bold"), bg="white", fg="#111827")
+        title.pack(anchor="w")
+        tk.Label(header, text=f"by {info['author']}", font=("Segoe UI", 10), bg="white", fg="#6b7280").pack(anchor="w")
+
+        # Availability pill
+        pill_wrap = tk.Frame(header, bg="white")
+        pill_wrap.pack(anchor="e")
+        text, fg, bg = availability(info)
+        self._pill(pill_wrap, text, fg=fg, bg=bg)
+
+        # Actions
+        actions = tk.Frame(card, bg="#f9fafb")
+        actions.pack(fill="x", padx=12, pady=10)
+
+        ttk.Button(actions, text="View Details", style="Ghost.TButton",
+                   command=lambda b=book_id: self.open_book_details(b)).pack(side="left", padx=4)
+        self._circulation_buttons(actions, book_id, info)
 
     def show_my_library(self):
-        self._clear_main()
-        self._section_title(self.main, "📖 My Library (Borrowed Books)")
+        view = self._view("my_library", ('books', 'borrowers'))
+        if view is None:
+            return
+        self._section_title(view, "📖 My Library (Borrowed Books)")
 
-        container = tk.Frame(self.main, bg="#f5f6fa")
+        container = tk.Frame(view, bg="#f5f6fa")
         container.pack(fill="both", expand=True)
 
         # Collect borrowed items across borrowers (for display)
@@ -336,10 +832,12 @@ class App:
                        command=lambda: self._return_and_refresh()).pack(side="left", padx=4)
 
     def show_manage(self):
-        self._clear_main()
-        self._section_title(self.main, "🛠️ Manage (Books & Borrowers)")
+        view = self._view("manage", ('books', 'borrowers'), refresh=self._refresh_manage)
+        if view is None:
+            return
+        self._section_title(view, "🛠️ Manage (Books & Borrowers)")
 
-        wrap = tk.Frame(self.main, bg="#f5f6fa")
+        wrap = tk.Frame(view, bg="#f5f6fa")
         wrap.pack(fill="both", expand=True, padx=16, pady=4)
 
         # Books table
@@ -366,21 +864,30 @@ class App:
         self.update_borrower_list()
 
         # Quick circulation buttons (uses the NLP dialogs)
-        btns = tk.Frame(self.main, bg="#f5f6fa")
+        btns = tk.Frame(view, bg="#f5f6fa")
         btns.pack(fill="x", padx=20, pady=8)
         ttk.Button(btns, text="Borrow Book", style="Primary.TButton",
                    command=self._borrow_and_refresh).pack(side="left", padx=4)
         ttk.Button(btns, text="Return Book", style="Ghost.TButton",
                    command=self._return_and_refresh).pack(side="left", padx=4)
+        ttk.Button(btns, text="Scan Mode", style="Ghost.TButton",
+                   command=self.open_scan_mode).pack(side="left", padx=4)
+        ttk.Button(btns, text="Find Duplicates", style="Ghost.TButton",
+                   command=self._find_duplicates).pack(side="left", padx=4)
+        for fmt in reversed(lms_export.FORMATS):
+            ttk.Button(btns, text=f"Export {fmt.upper()}", style="Ghost.TButton",
+                       command=lambda f=fmt: self._export(f)).pack(side="right", padx=4)
 
     def show_issue_book(self):
-        self._clear_main()
-        self._section_title(self.main, "➕ Issue Book")
+        view = self._view("issue_book")
+        if view is None:
+            return
+        self._section_title(view, "➕ Issue Book")
 
-        form = tk.Frame(self.main, bg="white", bd=1, relief="solid")
+        form = tk.Frame(view, bg="white", bd=1, relief="solid")
         form.pack(padx=20, pady=10, anchor="n")
 
-        labels = ["Book ID", "Title", "Author"]
+        labels = ["Book ID", "Title", "Author", "Copies"]
         self.issue_entries = {}
 
         for i, label in enumerate(labels):
@@ -388,15 +895,20 @@ class App:
             ent = ttk.Entry(form, width=40)
             ent.grid(row=i, column=1, padx=12, pady=8, ipady=3)
             self.issue_entries[label] = ent
+        self.issue_entries["Copies"].insert(0, "1")
 
         def submit():
             ok = add_book_logic(
                 self.issue_entries["Book ID"].get(),
                 self.issue_entries["Title"].get(),
-                self.issue_entries["Author"].get()
+                self.issue_entries["Author"].get(),
+                self.issue_entries["Copies"].get() or 1
             )
             if ok:
                 messagebox.showinfo("Success", "Book added!")
+                for ent in self.issue_entries.values():   # the form is cached, start fresh next time
+                    ent.delete(0, tk.END)
+                self.issue_entries["Copies"].insert(0, "1")
                 self.show_manage()
 
         btns = tk.Frame(form, bg="white")
@@ -405,10 +917,12 @@ class App:
         ttk.Button(btns, text="Cancel", style="Ghost.TButton", command=self.show_home).pack(side="left", padx=6)
 
     def show_add_borrower(self):
-        self._clear_main()
-        self._section_title(self.main, "👤 Add Borrower")
+        view = self._view("add_borrower")
+        if view is None:
+            return
+        self._section_title(view, "👤 Add Borrower")
 
-        form = tk.Frame(self.main, bg="white", bd=1, relief="solid")
+        form = tk.Frame(view, bg="white", bd=1, relief="solid")
         form.pack(padx=20, pady=10, anchor="n")
 
         labels = ["Borrower ID", "Name"]
@@ -427,6 +941,8 @@ class App:
             )
             if ok:
                 messagebox.showinfo("Success", "Borrower added!")
+                for ent in self.borrower_entries.values():
+                    ent.delete(0, tk.END)
                 self.show_manage()
 
         btns = tk.Frame(form, bg="white")
@@ -435,14 +951,40 @@ class App:
         ttk.Button(btns, text="Cancel", style="Ghost.TButton", command=self.show_home).pack(side="left", padx=6)
 
     def search_view(self):
-        self._clear_main()
+        view = self._view("search", deps=None)
         q = self.search_var.get()
-        self._section_title(self.main, f"🔎 Search Results for “{q}”")
+        self._section_title(view, f"🔎 Search Results for “{q}”")
+        tk.Label(view, text="Filter with title:, author:, available:yes or id:B100..B200; "
+                            "AND / OR / NOT, -word and -( ... ) work alongside a field.",
+                 font=("Segoe UI", 9), bg="#f5f6fa", fg="#9ca3af").pack(anchor="w", padx=20)
 
-        container = tk.Frame(self.main, bg="#f5f6fa")
+        container = tk.Frame(view, bg="#f5f6fa")
         container.pack(fill="both", expand=True)
+        tk.Label(container, text="Searching…",
+                 font=("Segoe UI", 11), bg="#f5f6fa", fg="#6b7280").pack(pady=20)
+
+        # fuzzy matching is slow on big catalogs: run it off the UI thread
+        if self._search_task:
+            self._search_task.cancel()
+        self._search_task = self.tasks.submit(
+            lambda task: search_books_logic(q, task), name=f"Searching “{q}”",
+            on_done=lambda results: self._show_search_results(container, results),
+            on_error=lambda e: self._show_search_error(container, e))
+
+    def _show_search_error(self, container, error):
+        self._search_task = None
+        if container.winfo_exists():
+            for w in container.winfo_children():
+                w.destroy()
+        messagebox.showerror("Invalid search", str(error))
+
+    def _show_search_results(self, container, results):
+        self._search_task = None
+        if not container.winfo_exists():   # user navigated away meanwhile
+            return
+        for w in container.winfo_children():
+            w.destroy()
 
-        results = search_books_logic(q)
         if not results:
             tk.Label(container, text="No matching books found.",
                      font=("Segoe UI", 11), bg="#f5f6fa", fg="#6b7280").pack(pady=20)
@@ -460,9 +1002,7 @@ class App:
 
             ttk.Button(actions, text="View Details", style="Ghost.TButton",
                        command=lambda b=book_id: self.open_book_details(b)).pack(side="left", padx=4)
-            ttk.Button(actions, text="Borrow", style="Primary.TButton",
-                       state=("normal" if info['available'] else "disabled"),
-                       command=lambda b=book_id: self._borrow_and_refresh(b)).pack(side="left", padx=4)
+            self._circulation_buttons(actions, book_id, info)
 
     # Book Details + Reviews 
     def open_book_details(self, book_id):
@@ -474,7 +1014,7 @@ class App:
 
         win = tk.Toplevel(self.root)
         win.title(info['title'])
-        win.geometry("520x520")
+        win.geometry("520x680")
         win.configure(bg="white")
         win.transient(self.root)
         win.grab_set()
@@ -482,14 +1022,55 @@ class App:
         tk.Label(win, text=info['title'], font=("Segoe UI", 15, "bold"), bg="white", fg="#111827").pack(anchor="w", padx=16, pady=10)
         tk.Label(win, text=f"by {info['author']}", font=("Segoe UI", 11), bg="white", fg="#6b7280").pack(anchor="w", padx=16)
 
-        status = "Available" if info['available'] else "Borrowed"
-        st_fg, st_bg = ("#065f46", "#d1fae5") if info['available'] else ("#92400e", "#ffedd5")
+        status, st_fg, st_bg = availability(info)
         tag = tk.Label(win, text=status, bg=st_bg, fg=st_fg, font=("Segoe UI", 9, "bold"))
         tag.pack(anchor="w", padx=16, pady=8, ipadx=6, ipady=2)
 
         sep = ttk.Separator(win, orient="horizontal")
         sep.pack(fill="x", padx=12, pady=8)
 
+        # Holds: queued holds (by hold_id) and copies waiting on the hold shelf
+        tk.Label(win, text="Holds", font=("Segoe UI", 12, "bold"), bg="white", fg="#111827").pack(anchor="w", padx=16, pady=6)
+        hold_list = tk.Listbox(win, height=4, font=("Segoe UI", 10), bd=0, highlightthickness=0, bg="#f9fafb")
+        hold_list.pack(fill="x", padx=16, pady=4)
+        hold_rows = []      # listbox row -> ('shelf', borrower_id) or ('queued', hold_id)
+
+        def refresh_holds():
+            hold_list.delete(0, tk.END)
+            hold_rows.clear()
+            for borrower_id in sorted(books[book_id]['held_for']):
+                hold_rows.append(('shelf', borrower_id))
+                hold_list.insert(tk.END, f"On hold shelf for {borrowers[borrower_id]['name']} ({borrower_id})")
+            for n, (hold_id, borrower_id) in enumerate(books[book_id]['holds'].entries(), 1):
+                hold_rows.append(('queued', hold_id))
+                hold_list.insert(tk.END, f"#{n}  Hold {hold_id}: {borrowers[borrower_id]['name']} ({borrower_id})")
+            if not hold_rows:
+                hold_list.insert(tk.END, "No holds.")
+            text, fg, bg = availability(books[book_id])
+            tag.config(text=text, fg=fg, bg=bg)
+
+        def hold_action(kind):
+            sel = hold_list.curselection()
+            if not sel or sel[0] >= len(hold_rows) or hold_rows[sel[0]][0] != kind:
+                messagebox.showerror("Error", "Select a queued hold to cancel." if kind == 'queued'
+                                     else "Select a copy on the hold shelf to release.")
+                return
+            key = hold_rows[sel[0]][1]
+            if kind == 'queued':
+                done = cancel_hold_logic(book_id, key)
+            else:
+                done = release_held_copy_logic(book_id, key)
+            if done:
+                refresh_holds()
+
+        refresh_holds()
+        hold_btns = tk.Frame(win, bg="white")
+        hold_btns.pack(fill="x", padx=16, pady=4)
+        ttk.Button(hold_btns, text="Cancel Hold", style="Ghost.TButton",
+                   command=lambda: hold_action('queued')).pack(side="left", padx=4)
+        ttk.Button(hold_btns, text="Release Copy", style="Ghost.TButton",
+                   command=lambda: hold_action('shelf')).pack(side="left", padx=4)
+
         # Reviews list
         tk.Label(win, text="Reviews", font=("Segoe UI", 12, "bold"), bg="white", fg="#111827").pack(anchor="w", padx=16, pady=6)
 
@@ -520,24 +1101,192 @@ class App:
 
         def save_review():
             text = review_var.get().strip()
-            label = add_review_logic(book_id, text)
-            if label:
-                review_var.set("")
-                refresh_reviews()  #  live update after save
+            if not text:
+                messagebox.showerror("Error", "Review cannot be empty.")
+                return
+
+            def store(label):
+                if add_review_logic(book_id, text, label) and win.winfo_exists():
+                    review_var.set("")
+                    refresh_reviews()  #  live update after save
+
+            # sentiment scoring runs in the background; the review is stored on the UI thread
+            self.tasks.submit(lambda task: score_review(text), name="Scoring review", on_done=store)
 
         btns = tk.Frame(win, bg="white")
         btns.pack(fill="x", padx=16, pady=8)
         ttk.Button(btns, text="Save Review", style="Primary.TButton", command=save_review).pack(side="left", padx=4)
         ttk.Button(btns, text="Close", style="Ghost.TButton", command=win.destroy).pack(side="left", padx=4)
 
+    # Scan mode: one patron, many barcodes, one commit
+    def open_scan_mode(self):
+        win = tk.Toplevel(self.root)
+        win.title("Scan Mode")
+        win.geometry("520x560")
+        win.configure(bg="white")
+        win.transient(self.root)
+
+        tk.Label(win, text="📷 Scan Mode", font=("Segoe UI", 15, "bold"), bg="white", fg="#111827").pack(anchor="w", padx=16, pady=10)
+
+        top = tk.Frame(win, bg="white")
+        top.pack(fill="x", padx=16, pady=4)
+        tk.Label(top, text="Borrower ID:", font=("Segoe UI", 10), bg="white").pack(side="left")
+        patron_var = tk.StringVar()
+        ttk.Entry(top, textvariable=patron_var, width=24).pack(side="left", padx=8, ipady=3)
+
+        mode_var = tk.StringVar(value="checkout")
+        modes = tk.Frame(win, bg="white")
+        modes.pack(fill="x", padx=16, pady=4)
+        for text, value in (("Check out", "checkout"), ("Return", "return")):
+            tk.Radiobutton(modes, text=text, variable=mode_var, value=value, bg="white",
+                           font=("Segoe UI", 10)).pack(side="left", padx=4)
+
+        tk.Label(win, text="Scan or type a Book ID and press Enter:", font=("Segoe UI", 10), bg="white").pack(anchor="w", padx=16, pady=(8, 0))
+        scan_var = tk.StringVar()
+        scan_entry = ttk.Entry(win, textvariable=scan_var)
+        scan_entry.pack(fill="x", padx=16, pady=6, ipady=4)
+
+        scan_list = tk.Listbox(win, font=("Segoe UI", 10), bd=0, highlightthickness=0, bg="#f9fafb")
+        scan_list.pack(fill="both", expand=True, padx=16, pady=6)
+        scans = []
+
+        def add_scan(_event=None):
+            code = scan_var.get().strip()
+            scan_var.set("")
+            if not code:
+                return
+            book_id = _book_ids_ci.get(code.lower())
+            scans.append(code)
+            # indexed lookup only; the full check happens on commit
+            scan_list.insert(tk.END, f"{book_id} — {books[book_id]['title']}" if book_id else f"✗ {code} (unknown ID)")
+            scan_list.see(tk.END)
+            count_var.set(f"{len(scans)} scanned")
+
+        def remove_selected():
+            for i in reversed(scan_list.curselection()):
+                scan_list.delete(i)
+                del scans[i]
+            count_var.set(f"{len(scans)} scanned")
+
+        def commit():
+            if not scans:
+                return
+            patron = patron_var.get().strip()
+            borrower_id = _borrower_ids_ci.get(patron.lower())
+            if not borrower_id:
+                # a name was typed: the match is fuzzy, so make the desk confirm it before a whole batch goes through
+                borrower_id = _resolve_borrower_id(patron)
+                if not borrower_id:
+                    messagebox.showerror("Error", "Borrower not found!", parent=win)
+                    return
+                if not messagebox.askyesno("Confirm borrower",
+                                           f"Commit {len(scans)} scan(s) for '{borrowers[borrower_id]['name']}' ({borrower_id})?",
+                                           parent=win):
+                    return
+            checkout = mode_var.get() == "checkout"
+            if checkout:
+                done, errors = batch_checkout_logic(borrower_id, scans)
+                set_aside = []
+            else:
+                done, errors, set_aside = batch_return_logic(borrower_id, scans)
+            if errors:
+                lines = "\n".join(f"{code}: {reason}" for code, reason in errors[:10])
+                more = f"\n… and {len(errors) - 10} more" if len(errors) > 10 else ""
+                messagebox.showerror("Nothing committed", f"Fix these scans and commit again:\n\n{lines}{more}", parent=win)
+                return
+            verb = "checked out to" if checkout else "returned by"
+            msg = f"{len(done)} book(s) {verb} '{borrowers[borrower_id]['name']}'"
+            if set_aside:
+                msg += "\n\nPut on the hold shelf:\n" + "\n".join(
+                    f"• {book_id} '{books[book_id]['title']}' for '{borrowers[next_id]['name']}'" for book_id, next_id in set_aside)
+            messagebox.showinfo("Success", msg, parent=win)
+            scans.clear()
+            scan_list.delete(0, tk.END)
+            count_var.set("0 scanned")
+            self.show_manage()      # one refresh for the whole batch
+            scan_entry.focus_set()
+
+        scan_entry.bind("<Return>", add_scan)
+
+        btns = tk.Frame(win, bg="white")
+        btns.pack(fill="x", padx=16, pady=8)
+        count_var = tk.StringVar(value="0 scanned")
+        ttk.Button(btns, text="Commit", style="Primary.TButton", command=commit).pack(side="left", padx=4)
+        ttk.Button(btns, text="Remove Selected", style="Ghost.TButton", command=remove_selected).pack(side="left", padx=4)
+        ttk.Button(btns, text="Close", style="Ghost.TButton", command=win.destroy).pack(side="left", padx=4)
+        tk.Label(btns, textvariable=count_var, font=("Segoe UI", 10), bg="white", fg="#6b7280").pack(side="right")
+
+        scan_entry.focus_set()
+
+    # Duplicate report (MinHash/LSH over the whole catalog, in the background)
+    def _find_duplicates(self):
+        self.tasks.submit(duplicate_report_logic, name="Looking for duplicates",
+                          on_done=self._show_duplicates,
+                          on_error=lambda e: messagebox.showerror("Error", str(e)))
+
+    def _show_duplicates(self, groups):
+        if not groups:
+            messagebox.showinfo("Duplicates", "No likely duplicates found.")
+            return
+
+        win = tk.Toplevel(self.root)
+        win.title("Likely Duplicates")
+        win.geometry("620x480")
+        win.configure(bg="white")
+        win.transient(self.root)
+
+        tk.Label(win, text=f"{len(groups)} group(s) of likely duplicates", font=("Segoe UI", 13, "bold"),
+                 bg="white", fg="#111827").pack(anchor="w", padx=16, pady=10)
+
+        dup_list = tk.Listbox(win, font=("Segoe UI", 10), bd=0, highlightthickness=0, bg="#f9fafb")
+        dup_list.pack(fill="both", expand=True, padx=16, pady=6)
+        for n, group in enumerate(groups, 1):
+            dup_list.insert(tk.END, f"Group {n}")
+            for b_id in group:
+                if b_id in books:
+                    dup_list.insert(tk.END, f"    {b_id}: {books[b_id]['title']} — {books[b_id]['author']}")
+
+        ttk.Button(win, text="Close", style="Ghost.TButton", command=win.destroy).pack(anchor="w", padx=16, pady=8)
+
     # List updaters (Manage view) 
+    def _refresh_manage(self):
+        self.update_book_list()
+        self.update_borrower_list()
+
+    BOOK_LIST_CHUNK = 500
+
     def update_book_list(self):
         if not self.book_tree:
             return
-        for item in self.book_tree.get_children():
-            self.book_tree.delete(item)
-        for book_id, info in books.items():
-            self.book_tree.insert("", "end", values=(book_id, info['title'], info['author'], 'Yes' if info['available'] else 'No'))
+        if self._book_list_job:
+            self.root.after_cancel(self._book_list_job)
+            self._book_list_job = None
+        self.book_tree.delete(*self.book_tree.get_children())
+        rows = [(book_id, info['title'], info['author'], f"{info['free']}/{info['copies']}")
+                for book_id, info in books.items()]
+        self._insert_book_rows(self.book_tree, rows, 0)
+
+    def _insert_book_rows(self, tree, rows, start):
+        # Treeview inserts must happen on the UI thread; do them in chunks so
+        # the window keeps repainting on large catalogs
+        self._book_list_job = None
+        if not tree.winfo_exists():
+            return
+        end = min(start + self.BOOK_LIST_CHUNK, len(rows))
+        for values in rows[start:end]:
+            tree.insert("", "end", values=values)
+        if end < len(rows):
+            self._on_task_status(True, end, len(rows), "Loading books")
+            self._book_list_job = self.root.after(1, self._insert_book_rows, tree, rows, end)
+        elif start:
+            self._book_list_done("Ready")
+
+    def _book_list_done(self, message):
+        # the strip may still be showing a background task
+        if self.tasks.active:
+            self._on_task_status(True, 0, None, self.tasks.active[-1].name)
+        else:
+            self._on_task_status(False, 0, None, message)
 
     def update_borrower_list(self):
         if not self.borrower_tree:
@@ -547,23 +1296,45 @@ class App:
             borrowed_books_str = ", ".join(info['borrowed_books'])
             self.borrower_tree.insert("", "end", values=(borrower_id, info['name'], borrowed_books_str))
 
+    #  Export (runs in the background, streams to disk)
+    def _export(self, fmt):
+        directory = filedialog.askdirectory(title=f"Export catalog, patrons, loans and reviews as {fmt.upper()}")
+        if not directory:
+            return
+
+        def done(counts):
+            summary = "\n".join(f"{table}: {n} rows" for table, n in counts.items())
+            messagebox.showinfo("Export complete", f"Exported to {directory}\n\n{summary}")
+
+        self.tasks.submit(lambda task: lms_export.export_all(books, borrowers, directory, fmt, task=task),
+                          name=f"Exporting {fmt.upper()}", on_done=done,
+                          on_error=lambda e: messagebox.showerror("Export failed", str(e)))
+
     #  Circulation triggers (keep NLP dialogs) 
     def _borrow_and_refresh(self, _book_id=None):
         brr_id, b_id = borrow_book_logic()
         if b_id:
-            self.update_book_list()
-            self.update_borrower_list()
+            # cached views see the new data_version and refresh when next shown
+            self.show_home()
+
+    def _hold_and_refresh(self, book_id):
+        borrower_id = _resolve_borrower_id(simpledialog.askstring("Borrower", "Enter Borrower Name or ID:"))
+        if not borrower_id:
+            messagebox.showerror("Error", "Borrower not found!")
+            return
+        if place_hold_logic(borrower_id, book_id):
             self.show_home()
 
     def _return_and_refresh(self):
         brr_id, b_id = return_book_logic()
         if b_id:
-            self.update_book_list()
-            self.update_borrower_list()
             self.show_my_library()
 
 
 if __name__ == "__main__":
+    # LMS_SHARDED_SEARCH=<workers> turns on multi-process search (0 = one per core)
+    if os.environ.get("LMS_SHARDED_SEARCH"):
+        enable_sharded_search(int(os.environ["LMS_SHARDED_SEARCH"]) or None)
     root = tk.Tk()
     app = App(root)
     root.mainloop()
@@ -0,0 +1,81 @@
+import pytest
+
+
+@pytest.fixture
+def desk(lms):
+    lms.add_book_logic("B1", "Dune", "Frank Herbert")
+    lms.add_book_logic("B2", "Emma", "Jane Austen", copies=2)
+    for borrower_id, name in (("P1", "Ada Lovelace"), ("P2", "Alan Turing"), ("P3", "Grace Hopper")):
+        lms.add_borrower_logic(borrower_id, name)
+    return lms
+
+
+def test_batch_checkout_is_all_or_nothing(desk):
+    assert desk.batch_checkout_logic("P1", ["b1", "B2"]) == (["B1", "B2"], [])
+    done, errors = desk.batch_checkout_logic("P2", ["B2", "B1", "nope"])
+    assert done == []
+    assert errors == [("B1", "No copy available"), ("nope", "Unknown book ID")]
+    assert desk.books["B2"]["free"] == 1
+
+
+def test_batch_return_reports_copies_set_aside_for_holds(desk):
+    desk.batch_checkout_logic("P1", ["B1", "B2"])
+    assert desk.place_hold_logic("P2", "B1")
+    done, errors, set_aside = desk.batch_return_logic("P1", ["B1", "B2"])
+    assert (done, errors) == (["B1", "B2"], [])
+    assert set_aside == [("B1", "P2")]
+    assert desk.books["B2"]["free"] == 2
+
+
+def test_batch_return_rejects_books_not_on_loan(desk):
+    desk.batch_checkout_logic("P1", ["B1"])
+    assert desk.batch_return_logic("P1", ["B1", "B2"]) == ([], [("B2", "Not borrowed by this borrower")], [])
+    assert desk.borrowers["P1"]["borrowed_books"] == ["B1"]
+
+
+def test_hold_queue_is_fifo_and_skips_cancelled_holds(lms):
+    queue = lms.HoldQueue()
+    first, second, third = (queue.place(b) for b in ("P1", "P2", "P3"))
+    assert queue.entries() == [(first, "P1"), (second, "P2"), (third, "P3")]
+    assert queue.hold_for("P2") == second
+    assert queue.cancel(second)
+    assert not queue.cancel(second)
+    assert (len(queue), list(queue)) == (2, ["P1", "P3"])
+    assert [queue.pop_next(), queue.pop_next(), queue.pop_next()] == ["P1", "P3", None]
+    assert queue.hold_for("P1") is None
+
+
+def test_returned_copy_goes_to_the_next_hold(desk):
+    desk.batch_checkout_logic("P1", ["B1"])
+    h2 = desk.place_hold_logic("P2", "B1")
+    desk.place_hold_logic("P3", "B1")
+    assert desk.cancel_hold_logic("B1", h2)
+    desk.batch_return_logic("P1", ["B1"])
+    book = desk.books["B1"]
+    assert (book['held_for'], book['free'], book['available']) == ({"P3"}, 0, False)
+    # only the patron it was set aside for can take it
+    assert desk.batch_checkout_logic("P2", ["B1"])[0] == []
+    assert desk.batch_checkout_logic("P3", ["B1"]) == (["B1"], [])
+    assert (book['held_for'], book['free']) == (set(), 0)
+
+
+def test_released_copy_goes_to_the_next_hold_then_the_shelf(desk):
+    desk.batch_checkout_logic("P1", ["B1"])
+    desk.place_hold_logic("P2", "B1")
+    desk.place_hold_logic("P3", "B1")
+    desk.batch_return_logic("P1", ["B1"])
+    book = desk.books["B1"]
+    assert desk.release_held_copy_logic("B1", "P2")
+    assert (book['held_for'], book['free']) == ({"P3"}, 0)
+    assert desk.release_held_copy_logic("B1", "P3")
+    assert (book['held_for'], book['free'], book['available']) == (set(), 1, True)
+    assert not desk.release_held_copy_logic("B1", "P3")
+    assert desk.search_books_logic("title:dune available:yes")[0][0] == "B1"
+
+
+def test_holds_are_refused_when_a_copy_is_free_or_already_on_loan(desk):
+    assert desk.place_hold_logic("P1", "B1") is None
+    desk.batch_checkout_logic("P1", ["B1"])
+    assert desk.place_hold_logic("P1", "B1") is None
+    assert desk.place_hold_logic("P2", "B1")
+    assert desk.place_hold_logic("P2", "B1") is None
@@ -0,0 +1,76 @@
+import re
+
+import pytest
+
+from lms_dedup import DuplicateIndex
+
+
+def tokenize(text):
+    return [w for w in re.findall(r"\w+", text.lower()) if w not in {"the", "of", "and", "a"}]
+
+
+CATALOG = [
+    ("B1", "Dune", "Frank Herbert"),
+    ("B2", "The Hobbit", "J.R.R. Tolkien"),
+    ("B3", "Harry Potter and the Philosopher's Stone", "J.K. Rowling"),
+    ("B4", "Pride & Prejudice", "Jane Austen"),
+    ("B5", "Emma", "Jane Austen"),
+    ("B6", "The Lord of the Rings", "J.R.R. Tolkien"),
+    ("N1", "Naruto Vol. 1", "Masashi Kishimoto"),
+    ("R1", "Rocky II", "Sylvester Stallone"),
+]
+
+
+@pytest.fixture
+def index():
+    idx = DuplicateIndex(tokenize)
+    for book_id, title, author in CATALOG:
+        idx.add(book_id, tokenize(title), tokenize(author))
+    return idx
+
+
+def candidates(index, title, author):
+    return [book_id for book_id, _ in index.candidates(tokenize(title), tokenize(author))]
+
+
+@pytest.mark.parametrize("title, author, expected", [
+    ("Dune", "Frank Herbet", "B1"),
+    ("The Hobbit", "J.R.R. Tolkein", "B2"),
+    ("Harry Potter and the Philosopher's Stone", "J.K. Rowlling", "B3"),
+    ("Harry Poter and the Philosophers Stone", "J. K. Rowling", "B3"),
+    ("Pride and Prejudice", "Jane Austin", "B4"),
+])
+def test_misspellings_are_flagged(index, title, author, expected):
+    assert candidates(index, title, author) == [expected]
+
+
+@pytest.mark.parametrize("title, author", [
+    ("Dune Messiah", "Frank Herbert"),
+    ("Children of Dune", "Frank Herbert"),
+    ("Harry Potter and the Chamber of Secrets", "J.K. Rowling"),
+    ("Persuasion", "Jane Austen"),
+    ("The Two Towers", "J.R.R. Tolkien"),
+    ("Emma", "Emma Donoghue"),
+    ("Naruto Vol. 2", "Masashi Kishimoto"),
+    ("Naruto Vol. 11", "Masashi Kishimoto"),
+    ("Rocky III", "Sylvester Stallone"),
+])
+def test_other_books_are_not_flagged(index, title, author):
+    assert candidates(index, title, author) == []
+
+
+def test_report_groups_duplicates_only(index):
+    index.add("D1", tokenize("Dune"), tokenize("Frank Herbet"))
+    index.add("D2", tokenize("Dune Messiah"), tokenize("Frank Herbert"))
+    index.add("N2", tokenize("Naruto Vol. 2"), tokenize("Masashi Kishimoto"))
+    assert index.report() == [["B1", "D1"]]
+
+
+def test_bulk_import_keeps_every_volume(lms):
+    records = [(f"N{n}", f"Naruto Vol. {n}", "Masashi Kishimoto") for n in (1, 2, 3)]
+    records.append(("D1", "Dune", "Frank Herbert"))
+    records.append(("D2", "Dune", "Frank Herbet"))
+    added, flagged, errors = lms.add_books_bulk_logic(records)
+    assert added == ["N1", "N2", "N3", "D1"]
+    assert [(book_id, [d[0] for d in dups]) for book_id, dups in flagged] == [("D2", ["D1"])]
+    assert not errors
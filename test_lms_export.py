@@ -0,0 +1,67 @@
+import csv
+import json
+import os
+
+import pytest
+
+import lms_export
+
+BOOKS = {
+    "B1": {'title': "Dune", 'author': "Frank Herbert", 'available': True, 'copies': 2, 'free': 1,
+           'holds': [], 'reviews': []},
+    "B2": {'title': "Emma", 'author': "Jane Austen", 'available': False, 'copies': 1, 'free': 0,
+           'holds': ["P2"], 'reviews': []},
+}
+BORROWERS = {
+    "P1": {'name': "Ada Lovelace", 'borrowed_books': ["B1", "B2"]},
+    "P2": {'name': "Alan Turing", 'borrowed_books': []},
+}
+
+
+@pytest.mark.parametrize("fmt", lms_export.FORMATS)
+def test_export_all_writes_every_table_even_when_empty(tmp_path, fmt):
+    counts = lms_export.export_all(BOOKS, BORROWERS, tmp_path, fmt, chunk_size=1)
+    assert counts == {'catalog': 2, 'patrons': 2, 'loans': 2, 'reviews': 0}
+    for table in lms_export.TABLES:
+        assert os.path.exists(tmp_path / f"{table}.{fmt}")
+
+
+def test_csv_and_jsonl_rows(tmp_path):
+    lms_export.export_table('catalog', BOOKS, BORROWERS, tmp_path / "c.csv", "csv")
+    with open(tmp_path / "c.csv", newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == list(lms_export.COLUMNS['catalog'])
+    assert rows[2] == ["B2", "Emma", "Jane Austen", "False", "1", "0", "1", "0"]
+
+    lms_export.export_table('loans', BOOKS, BORROWERS, tmp_path / "l.jsonl", "jsonl")
+    with open(tmp_path / "l.jsonl", encoding="utf-8") as f:
+        loans = [json.loads(line) for line in f]
+    assert [loan["title"] for loan in loans] == ["Dune", "Emma"]
+
+
+def test_parquet_keeps_column_types_for_empty_tables(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    lms_export.export_table('reviews', BOOKS, BORROWERS, tmp_path / "r.parquet", "parquet")
+    lms_export.export_table('catalog', BOOKS, BORROWERS, tmp_path / "c.parquet", "parquet", chunk_size=1)
+    empty = pq.read_table(tmp_path / "r.parquet")
+    assert empty.num_rows == 0
+    assert empty.column_names == list(lms_export.COLUMNS['reviews'])
+    catalog = pq.read_table(tmp_path / "c.parquet")
+    assert catalog.column("copies").to_pylist() == [2, 1]
+    assert catalog.column("available").to_pylist() == [True, False]
+
+
+class _CancelAfterFirstChunk:
+    def check(self):
+        raise RuntimeError("cancelled")
+
+    def report(self, *args):
+        pass
+
+
+@pytest.mark.parametrize("fmt", lms_export.FORMATS)
+def test_failed_export_leaves_no_partial_file(tmp_path, fmt):
+    path = tmp_path / f"catalog.{fmt}"
+    with pytest.raises(RuntimeError):
+        lms_export.export_table('catalog', BOOKS, BORROWERS, path, fmt, chunk_size=1, task=_CancelAfterFirstChunk())
+    assert not os.path.exists(path)
@@ -0,0 +1,110 @@
+import re
+
+import pytest
+
+from lms_query import FieldIndex, QueryError, is_structured
+
+STOPWORDS = {"the", "of", "and", "a", "to"}
+
+
+def tokenize(text):
+    return [w for w in re.findall(r"\w+", text.lower()) if w not in STOPWORDS]
+
+
+CATALOG = [
+    ("B1", "Harry Potter and the Philosopher's Stone", "J K Rowling", True),
+    ("B2", "The Hobbit", "J R R Tolkien", True),
+    ("B20", "The Silmarillion", "J R R Tolkien", False),
+    ("B100", "Dune", "Frank Herbert", True),
+    ("B200", "Emma", "Jane Austen", False),
+    ("B1000", "Harry Potter and the Chamber of Secrets", "J K Rowling", False),
+]
+
+
+@pytest.fixture
+def index():
+    idx = FieldIndex(tokenize)
+    for book_id, title, author, available in CATALOG:
+        idx.add(book_id, tokenize(title), tokenize(author), available)
+    return idx
+
+
+def test_field_terms_and_implicit_and(index):
+    assert index.search("author:rowling") == ["B1", "B1000"]
+    assert index.search("author:rowling available:yes") == ["B1"]
+    assert index.search("author:tolkien hobbit") == ["B2"]
+
+
+def test_or_binds_looser_than_and(index):
+    assert index.search("title:dune OR title:emma") == ["B100", "B200"]
+    # (author:tolkien AND available:no) OR title:dune
+    assert index.search("author:tolkien available:no OR title:dune") == ["B20", "B100"]
+    assert index.search("author:tolkien (available:no OR title:hobbit)") == ["B2", "B20"]
+
+
+def test_not_and_minus(index):
+    assert index.search("author:tolkien NOT title:silmarillion") == ["B2"]
+    assert index.search("author:tolkien -title:silmarillion") == ["B2"]
+    assert index.search("author:rowling -available:no") == ["B1"]
+
+
+def test_minus_before_a_group(index):
+    assert index.search("author:tolkien -(title:silmarillion)") == ["B2"]
+    assert index.search("author:tolkien -(title:silmarillion OR title:hobbit)") == []
+    assert index.search("author:rowling -(available:no)") == ["B1"]
+
+
+def test_space_after_the_colon(index):
+    assert index.search("author: rowling") == ["B1", "B1000"]
+    assert index.search('author: "j k rowling" available: yes') == ["B1"]
+    assert index.search("title: dune OR title: emma") == ["B100", "B200"]
+
+
+def test_id_ranges_use_natural_order(index):
+    assert index.search("id:B2..B100") == ["B2", "B20", "B100"]
+    assert index.search("id:b100..") == ["B100", "B200", "B1000"]
+    assert index.search("id:..B20") == ["B1", "B2", "B20"]
+    assert index.search("id:b200") == ["B200"]
+
+
+def test_exact_terms_skip_fuzzy_expansion(index):
+    assert index.search("author:rowlling") == ["B1", "B1000"]
+    assert index.search("author:=rowlling") == []
+    assert index.search("author:=rowling") == ["B1", "B1000"]
+
+
+def test_fuzzy_terms_stay_in_their_field(index):
+    assert index.search("title:frank") == []
+    assert index.search("author:frank") == ["B100"]
+
+
+def test_quoted_values_need_every_word(index):
+    assert index.search('title:"harry chamber"') == ["B1000"]
+
+
+def test_field_names_are_case_insensitive(index):
+    assert is_structured("Author:rowling")
+    assert index.search("Author:rowling AVAILABLE:yes") == ["B1"]
+
+
+def test_plain_queries_are_not_structured():
+    assert not is_structured("WHAT NOT TO WEAR")
+    assert not is_structured("harry OR potter")
+    assert not is_structured("-potter")
+    assert not is_structured("Dune: Messiah")
+    assert is_structured("potter -author:rowling")
+    assert is_structured("(title:dune OR title:emma)")
+
+
+@pytest.mark.parametrize("query", ["(author:rowling", "author:rowling)", "colour:red",
+                                   "author:", "available:maybe", "title:dune OR",
+                                   "author:tolkien - hobbit", "title: OR title:dune"])
+def test_bad_syntax_raises(index, query):
+    with pytest.raises(QueryError):
+        index.search(query)
+
+
+def test_add_is_idempotent(index):
+    index.add("B2", ["hobbit"], ["tolkien"])
+    assert len(index) == len(CATALOG)
+    assert index.search("title:hobbit") == ["B2"]
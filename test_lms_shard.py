@@ -0,0 +1,67 @@
+import threading
+
+import pytest
+
+from lms_shard import ShardedIndex
+
+BOOKS = {
+    "B1": {'keywords': {"dune", "frank", "herbert"}},
+    "B2": {'keywords': {"emma", "jane", "austen"}},
+    "B3": {'keywords': {"dune", "messiah", "frank", "herbert"}},
+    "B4": {'keywords': {"hobbit", "tolkien"}},
+}
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_search_ranks_by_distance_then_catalog_order(workers):
+    index = ShardedIndex(BOOKS, workers)
+    try:
+        index.start()
+        assert index.search(["dune"]) == [("B1", 0), ("B3", 0), ("B2", 2)]
+        assert index.search(["tolkein"]) == [("B4", 2)]
+        assert index.search(["zzzzzzzz"]) == []
+    finally:
+        index.close()
+
+
+def test_rebuild_records_the_version():
+    index = ShardedIndex({}, 0, version=3)
+    assert (len(index), index.version) == (0, 3)
+    index.rebuild(BOOKS, 4)
+    assert (len(index), index.version) == (4, 4)
+
+
+def test_search_picks_up_added_books(lms, monkeypatch):
+    monkeypatch.setattr(lms, "SHARD_MIN_BOOKS", 1)
+    lms.add_book_logic("B1", "Dune", "Frank Herbert")
+    lms.enable_sharded_search(0)
+    try:
+        lms.add_book_logic("B2", "Dune Messiah", "Frank Herbert")
+        assert [book_id for book_id, _ in lms.search_books_logic("messiah")] == ["B2"]
+    finally:
+        lms.disable_sharded_search()
+
+
+def test_search_falls_back_when_sharding_is_switched_off_mid_search(lms, monkeypatch):
+    monkeypatch.setattr(lms, "SHARD_MIN_BOOKS", 1)
+    lms.add_book_logic("B1", "Dune", "Frank Herbert")
+    lms.enable_sharded_search(0)
+    searching, switched_off = threading.Event(), threading.Event()
+
+    class Task:
+        # the search has seen sharding on; switch it off before it takes the lock
+        def check(self):
+            pass
+
+        def report(self, *args):
+            searching.set()
+            switched_off.wait(5)
+
+    results = []
+    worker = threading.Thread(target=lambda: results.append(lms.search_books_logic("dune", Task())))
+    worker.start()
+    searching.wait(5)
+    lms.disable_sharded_search()
+    switched_off.set()
+    worker.join(5)
+    assert [book_id for book_id, _ in results[0]] == ["B1"]
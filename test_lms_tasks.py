@@ -0,0 +1,108 @@
+from unittest import mock
+
+import pytest
+
+from lms_tasks import TaskRunner
+
+
+def spin(task):
+    while True:
+        task.check()
+
+
+def test_submit_passes_task_first_and_reports_result(root):
+    runner = TaskRunner(root)
+    results = []
+    runner.submit(lambda task, x: (task.name, x * 2), 21, name="Double", on_done=results.append)
+    root.pump(lambda: results)
+    assert results == [("Double", 42)]
+    assert not runner.active
+
+
+def test_errors_and_cancellation_reach_their_callbacks(root):
+    runner = TaskRunner(root)
+    errors, cancelled = [], []
+
+    def fail(task):
+        raise ValueError("boom")
+
+    runner.submit(fail, on_error=errors.append)
+    task = runner.submit(spin, on_cancel=lambda: cancelled.append(True))
+    task.cancel()
+    root.pump(lambda: errors and cancelled)
+    assert str(errors[0]) == "boom"
+
+
+def test_status_stays_busy_until_every_task_is_done(root):
+    runner = TaskRunner(root, on_status=lambda *status: statuses.append(status))
+    statuses, finished = [], []
+    slow = runner.submit(spin, name="Slow")
+    runner.submit(lambda task: None, name="Quick", on_done=finished.append)
+    root.pump(lambda: finished)
+    assert statuses[-1][0] is True and statuses[-1][3] == "Slow"
+    slow.cancel()
+    root.pump(lambda: not runner.active)
+    assert statuses[-1][0] is False
+
+
+def test_search_logic_through_the_runner(root, lms):
+    lms.add_book_logic("B1", "Dune", "Frank Herbert")
+    lms.add_book_logic("B2", "Emma", "Jane Austen")
+    runner = TaskRunner(root)
+    results = []
+    for query in ("herbert", "author:austen"):
+        runner.submit(lambda task, q=query: lms.search_books_logic(q, task), on_done=results.append,
+                      on_error=pytest.fail)
+    root.pump(lambda: len(results) == 2)
+    assert sorted(book_id for hits in results for book_id, _ in hits) == ["B1", "B2"]
+
+
+def test_search_view_submits_the_query_not_the_task(root, lms, monkeypatch):
+    lms.add_book_logic("B1", "Dune", "Frank Herbert")
+    monkeypatch.setattr(lms.tk, "Label", mock.MagicMock())
+    monkeypatch.setattr(lms.tk, "Frame", mock.MagicMock())
+    app = lms.App.__new__(lms.App)
+    app.tasks = TaskRunner(root)
+    app._search_task = None
+    app.search_var = mock.Mock(get=lambda: "dune")
+    app._view = mock.MagicMock()
+    app._section_title = mock.MagicMock()
+    shown, errors = [], []
+    app._show_search_results = lambda container, results: shown.append(results)
+    app._show_search_error = lambda container, e: errors.append(e)
+
+    app.search_view()
+    root.pump(lambda: shown or errors)
+    assert not errors
+    assert [book_id for book_id, _ in shown[0]] == ["B1"]
+
+
+def test_process_tasks_run_in_a_fresh_interpreter(root):
+    runner = TaskRunner(root, max_workers=1)
+    results = []
+    runner.submit(pow, 2, 10, process=True, on_done=results.append)
+    root.pump(lambda: results, timeout=60)
+    assert results == [1024]
+    assert runner._processes._mp_context.get_start_method() in ("forkserver", "spawn")
+    runner.shutdown()
+
+
+def test_home_cards_are_built_in_chunks(root, lms, monkeypatch):
+    lms.add_books_bulk_logic([(f"B{n}", f"Title {n}", "Author") for n in range(120)], allow_duplicates=True)
+    monkeypatch.setattr(lms.tk, "Label", mock.MagicMock())
+    monkeypatch.setattr(lms.tk, "Frame", mock.MagicMock())
+    app = lms.App.__new__(lms.App)
+    app.root = root
+    app.tasks = TaskRunner(root)
+    app._home_job = None
+    app._view = mock.MagicMock()
+    app._section_title = mock.MagicMock()
+    app._on_task_status = mock.MagicMock()
+    built = []
+    app._home_card = lambda container, book_id, info: built.append(book_id)
+
+    app.show_home()
+    assert len(built) == app.HOME_CARD_CHUNK
+    root.pump(lambda: len(built) == 120)
+    assert built == list(lms.books)
+    assert app._on_task_status.call_args[0][:2] == (False, 0)